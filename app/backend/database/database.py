@@ -1,25 +1,100 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from dotenv import load_dotenv
 import os
 
+from app.backend.database.pool import StatsAsyncQueuePool, StatsQueuePool
+from app.backend.database.replicas import ReplicaRouter, ReplicaSession
+
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+USE_ASYNC_DB = os.getenv("USE_ASYNC_DB", "false").lower() == "true"
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or make_url(
+    SQLALCHEMY_DATABASE_URL
+).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_RETRY_INTERVAL = float(os.getenv("REPLICA_RETRY_INTERVAL", 30))
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+POOL_OPTIONS = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"options": "-csearch_path=public"}
+    connect_args={"options": "-csearch_path=public"},
+    poolclass=StatsQueuePool,
+    **POOL_OPTIONS
+)
+# objects keep their loaded and just-written state after commit, so write
+# paths do not need a refresh() round trip to serialize what they created
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+replica_router = ReplicaRouter(
+    [
+        create_engine(
+            url,
+            connect_args={"options": "-csearch_path=public"},
+            poolclass=StatsQueuePool,
+            **POOL_OPTIONS
+        )
+        for url in DATABASE_REPLICA_URLS
+    ],
+    retry_interval=REPLICA_RETRY_INTERVAL
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+if USE_ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args={"server_settings": {"search_path": "public"}},
+        poolclass=StatsAsyncQueuePool,
+        **POOL_OPTIONS
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+def get_pool_stats() -> dict:
+    stats = {"sync": engine.pool.stats()}
+    if USE_ASYNC_DB:
+        stats["async"] = async_engine.pool.stats()
+    if replica_router.engines:
+        stats["read_replicas"] = replica_router.stats()
+    return stats
+
+
+def open_read_session(use_primary: bool = False) -> Session:
+    if use_primary or not replica_router.engines:
+        return SessionLocal()
+    return ReplicaSession(replica_router, engine, autoflush=False)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,56 @@
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+import time
+
+from app.backend.services.metrics import POOL_CHECKOUT_LATENCY
+
+
+class PoolStatsMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        must_wait = (
+            self._max_overflow > -1
+            and self.checkedin() == 0
+            and self.overflow() >= self._max_overflow
+        )
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            POOL_CHECKOUT_LATENCY.observe(elapsed)
+            if must_wait:
+                self.waits += 1
+                self.wait_time += elapsed
+        self.checkouts += 1
+        return conn
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+            "wait_time": round(self.wait_time, 6),
+            "timeouts": self.timeouts,
+        }
+
+
+class StatsQueuePool(PoolStatsMixin, QueuePool):
+    pass
+
+
+class StatsAsyncQueuePool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    pass
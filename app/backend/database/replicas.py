@@ -0,0 +1,75 @@
+from threading import Lock
+from typing import Iterator, List, Tuple
+from sqlalchemy import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+import itertools
+import time
+
+
+class ReplicaRouter:
+    def __init__(self, engines: List[Engine], retry_interval: float = 30.0):
+        self.engines = engines
+        self.retry_interval = retry_interval
+        self._down_until = [0.0] * len(engines)
+        self._counter = itertools.count()
+        self._lock = Lock()
+        self.failovers = 0
+
+    def candidates(self) -> Iterator[Tuple[int, Engine]]:
+        if not self.engines:
+            return
+        start = next(self._counter)
+        now = time.monotonic()
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._down_until[index] <= now:
+                yield index, self.engines[index]
+
+    def mark_down(self, index: int) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_interval
+            self.failovers += 1
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "failovers": self.failovers,
+            "replicas": [
+                {
+                    "host": engine.url.host,
+                    "healthy": self._down_until[index] <= now,
+                    **engine.pool.stats(),
+                }
+                for index, engine in enumerate(self.engines)
+            ],
+        }
+
+
+class ReplicaSession(Session):
+    # Bound to a replica without touching it, so requests that never query
+    # (cache hits) never check out a connection. If the first statement cannot
+    # reach the replica, it is marked down and the statement is retried on the
+    # next one, and finally on the primary.
+    def __init__(self, router: ReplicaRouter, primary: Engine, **kwargs):
+        self._router = router
+        self._primary = primary
+        self._candidates = router.candidates()
+        self._replica_index, bind = next(self._candidates, (None, primary))
+        super().__init__(bind=bind, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        while self._replica_index is not None and not self.in_transaction():
+            try:
+                return super().execute(*args, **kwargs)
+            except OperationalError:
+                self.rollback()
+                self._router.mark_down(self._replica_index)
+                self._replica_index, self.bind = next(self._candidates, (None, self._primary))
+        return super().execute(*args, **kwargs)
+
+    def scalar(self, statement, params=None, **kwargs):
+        return self.execute(statement, params, **kwargs).scalar()
+
+    def scalars(self, statement, params=None, **kwargs):
+        return self.execute(statement, params, **kwargs).scalars()
@@ -1,23 +1,62 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.backend.routers import auth, links
+from app.backend.database import database
+from app.backend.database.database import USE_ASYNC_DB
+from app.backend.routers import auth, async_links, links, service
+from app.backend.services.cache import shared_cache, start_cache_invalidation_listener
+from app.backend.services.click_buffer import click_buffer
+from app.backend.services.fast_redirect import REDIRECT_FAST_PATH, RedirectFastPathMiddleware
+from app.backend.services.expiry_sweeper import expiry_sweeper, SWEEP_ENABLED
+from app.backend.services.metrics import MetricsMiddleware, metrics_endpoint
+from app.backend.services.security import shutdown_hash_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_cache_invalidation_listener()
+    click_buffer.start()
+    if SWEEP_ENABLED:
+        expiry_sweeper.start()
+    yield
+    expiry_sweeper.stop()
+    click_buffer.stop()
+    shutdown_hash_pool()
+    if shared_cache is not None:
+        shared_cache.close()
+    if USE_ASYNC_DB:
+        await database.async_engine.dispose()
+
 
 app = FastAPI(
     title="URL Shortener",
     description="Service for shortening URLs with analytics",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# the last added middleware is the outermost: the fast path answers inside
+# CORS, so its redirects and errors carry the same headers as the routes
+if REDIRECT_FAST_PATH:
+    app.add_middleware(RedirectFastPathMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(MetricsMiddleware)
+
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 app.include_router(auth.router)
+app.include_router(service.router)
+# exactly one of the sync and async twins is registered, so operation ids stay unique
+app.include_router(async_links.shorten_router if USE_ASYNC_DB else links.shorten_router)
 app.include_router(links.router)
+app.include_router(async_links.redirect_router if USE_ASYNC_DB else links.redirect_router)
 
 
 @app.get("/")
@@ -0,0 +1,48 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 12:00:00
+
+The users and links tables as they were before migrations were introduced.
+Such databases are stamped once with `alembic stamp 0001`. Later revisions
+skip objects that already exist, so `alembic upgrade head` works whichever
+of them an older deployment already created by hand.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False, unique=True),
+        sa.Column("email", sa.String(100), nullable=False, unique=True),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "links",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("original_url", sa.Text(), nullable=False),
+        sa.Column("short_code", sa.String(10), nullable=False, unique=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime(timezone=True)),
+        sa.Column("clicks", sa.Integer()),
+        sa.Column("last_accessed_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_links_id", "links", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("links")
+    op.drop_table("users")
@@ -0,0 +1,33 @@
+"""trigram index for /search
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 12:01:00
+
+Built CONCURRENTLY so a large links table keeps serving writes.
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_links_original_url_trgm",
+            "links",
+            ["original_url"],
+            postgresql_using="gin",
+            postgresql_ops={"original_url": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_links_original_url_trgm", "links", postgresql_concurrently=True, if_exists=True)
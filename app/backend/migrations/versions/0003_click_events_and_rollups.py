@@ -0,0 +1,40 @@
+"""click event log and per-bucket rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 12:02:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "click_events",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("short_code", sa.String(10), nullable=False),
+        sa.Column("clicked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("referrer", sa.Text()),
+        sa.Column("user_agent_class", sa.String(16)),
+        if_not_exists=True,
+    )
+    op.create_index("ix_click_events_short_code", "click_events", ["short_code"], if_not_exists=True)
+
+    op.create_table(
+        "click_rollups",
+        sa.Column("short_code", sa.String(10), primary_key=True),
+        sa.Column("granularity", sa.String(8), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("clicks", sa.BigInteger(), nullable=False),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("click_rollups")
+    op.drop_table("click_events")
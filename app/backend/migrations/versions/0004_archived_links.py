@@ -0,0 +1,34 @@
+"""archive for links expired past the grace period
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:03:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_links",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("original_url", sa.Text(), nullable=False),
+        sa.Column("short_code", sa.String(10), nullable=False),
+        sa.Column("user_id", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("expires_at", sa.DateTime(timezone=True)),
+        sa.Column("clicks", sa.Integer()),
+        sa.Column("last_accessed_at", sa.DateTime(timezone=True)),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_archived_links_short_code", "archived_links", ["short_code"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("archived_links")
@@ -0,0 +1,27 @@
+"""per-link redirect status
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 12:05:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "links",
+        sa.Column("redirect_status", sa.SmallInteger(), nullable=False, server_default="307"),
+        if_not_exists=True,
+    )
+    op.add_column("archived_links", sa.Column("redirect_status", sa.SmallInteger()), if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_column("archived_links", "redirect_status")
+    op.drop_column("links", "redirect_status")
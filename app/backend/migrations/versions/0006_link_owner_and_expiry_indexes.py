@@ -0,0 +1,38 @@
+"""indexes for owner listing and expiry scans
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 12:10:00
+
+Built CONCURRENTLY so a large links table keeps serving writes.
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_links_user_id_created_at",
+            "links",
+            ["user_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_links_expires_at",
+            "links",
+            ["expires_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_links_expires_at", "links", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_links_user_id_created_at", "links", postgresql_concurrently=True, if_exists=True)
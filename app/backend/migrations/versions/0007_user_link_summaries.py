@@ -0,0 +1,33 @@
+"""per-user link summaries
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 13:00:00
+
+Rows are built lazily on the first /links/user/summary request, so no
+backfill is needed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_link_summaries",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("total_links", sa.Integer(), nullable=False),
+        sa.Column("expired_links", sa.Integer(), nullable=False),
+        sa.Column("total_clicks", sa.BigInteger(), nullable=False),
+        sa.Column("top_links", sa.JSON(), nullable=False),
+        sa.Column("refresh_at", sa.DateTime(timezone=True)),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_link_summaries")
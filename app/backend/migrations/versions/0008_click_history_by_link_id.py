@@ -0,0 +1,70 @@
+"""key click events and rollups by link id
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 14:00:00
+
+Existing rows are attributed by short_code to the link (current or archived)
+that held the code when the click happened. Rows of codes that no longer
+belong to any link, such as deleted links or codes renamed away, cannot be
+attributed and are dropped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def attribute(table: str, started: str, ended: str) -> None:
+    # a row belongs to the link that held its code between started and ended
+    op.execute(
+        f"UPDATE {table} AS t SET link_id = l.id FROM links AS l "
+        f"WHERE l.short_code = t.short_code AND {ended} >= l.created_at"
+    )
+    op.execute(
+        f"UPDATE {table} AS t SET link_id = l.id FROM archived_links AS l "
+        f"WHERE t.link_id IS NULL AND l.short_code = t.short_code "
+        f"AND {ended} >= l.created_at AND {started} < l.archived_at"
+    )
+    op.execute(f"DELETE FROM {table} WHERE link_id IS NULL")
+    op.alter_column(table, "link_id", nullable=False)
+
+
+def upgrade() -> None:
+    op.add_column("click_events", sa.Column("link_id", sa.Integer()))
+    attribute("click_events", "t.clicked_at", "t.clicked_at")
+    op.drop_index("ix_click_events_short_code", table_name="click_events")
+    op.drop_column("click_events", "short_code")
+    op.create_index("ix_click_events_link_id", "click_events", ["link_id"])
+
+    op.add_column("click_rollups", sa.Column("link_id", sa.Integer()))
+    attribute(
+        "click_rollups",
+        "t.bucket_start",
+        "t.bucket_start + CASE t.granularity WHEN 'day' THEN interval '1 day' ELSE interval '1 hour' END"
+    )
+    op.drop_constraint("click_rollups_pkey", "click_rollups", type_="primary")
+    op.drop_column("click_rollups", "short_code")
+    op.create_primary_key("click_rollups_pkey", "click_rollups", ["link_id", "granularity", "bucket_start"])
+
+
+def downgrade() -> None:
+    # only history of current links can go back under a unique short_code
+    for table in ("click_events", "click_rollups"):
+        op.add_column(table, sa.Column("short_code", sa.String(10)))
+        op.execute(
+            f"UPDATE {table} AS t SET short_code = l.short_code FROM links AS l WHERE l.id = t.link_id"
+        )
+        op.execute(f"DELETE FROM {table} WHERE short_code IS NULL")
+        op.alter_column(table, "short_code", nullable=False)
+
+    op.drop_index("ix_click_events_link_id", table_name="click_events")
+    op.drop_column("click_events", "link_id")
+    op.create_index("ix_click_events_short_code", "click_events", ["short_code"])
+
+    op.drop_constraint("click_rollups_pkey", "click_rollups", type_="primary")
+    op.drop_column("click_rollups", "link_id")
+    op.create_primary_key("click_rollups_pkey", "click_rollups", ["short_code", "granularity", "bucket_start"])
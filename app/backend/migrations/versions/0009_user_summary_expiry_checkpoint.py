@@ -0,0 +1,35 @@
+"""count summary expiries from a checkpoint
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 15:00:00
+
+Existing summary rows have no checkpoint yet and are rebuilt on their next
+read. The index is built CONCURRENTLY so a large links table keeps serving
+writes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("user_link_summaries", sa.Column("expired_through", sa.DateTime(timezone=True)))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_links_user_id_expires_at",
+            "links",
+            ["user_id", "expires_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_links_user_id_expires_at", "links", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("user_link_summaries", "expired_through")
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func
+from sqlalchemy import (
+    BigInteger, Column, Integer, JSON, SmallInteger, String, Text, ForeignKey, DateTime, DDL, Index, event, func
+)
 from sqlalchemy.orm import relationship
 from app.backend.database.database import Base
 
@@ -14,6 +16,9 @@ class User(Base):
 
     links = relationship("Link", back_populates="user")
 
+    # server-generated id and created_at come back with INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class Link(Base):
     __tablename__ = "links"
@@ -26,5 +31,78 @@ class Link(Base):
     expires_at = Column(DateTime(timezone=True))
     clicks = Column(Integer, default=0)
     last_accessed_at = Column(DateTime(timezone=True))
+    redirect_status = Column(SmallInteger, nullable=False, default=307, server_default="307")
 
     user = relationship("User", back_populates="links")
+
+    __mapper_args__ = {"eager_defaults": True}
+
+    __table_args__ = (
+        Index("ix_links_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_links_expires_at", "expires_at"),
+        Index("ix_links_user_id_expires_at", "user_id", "expires_at"),
+        Index(
+            "ix_links_original_url_trgm",
+            "original_url",
+            postgresql_using="gin",
+            postgresql_ops={"original_url": "gin_trgm_ops"}
+        ),
+    )
+
+
+class ArchivedLink(Base):
+    __tablename__ = "archived_links"
+
+    id = Column(Integer, primary_key=True)
+    original_url = Column(Text, nullable=False)
+    short_code = Column(String(10), nullable=False, index=True)
+    user_id = Column(Integer)
+    created_at = Column(DateTime(timezone=True))
+    expires_at = Column(DateTime(timezone=True))
+    clicks = Column(Integer, default=0)
+    last_accessed_at = Column(DateTime(timezone=True))
+    redirect_status = Column(SmallInteger)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ClickEvent(Base):
+    __tablename__ = "click_events"
+
+    id = Column(BigInteger, primary_key=True)
+    # links.id rather than short_code: codes can be renamed or reused, and
+    # archived links keep their id, so history stays with the link it belongs to
+    link_id = Column(Integer, nullable=False, index=True)
+    clicked_at = Column(DateTime(timezone=True), nullable=False)
+    referrer = Column(Text)
+    user_agent_class = Column(String(16))
+
+
+class ClickRollup(Base):
+    __tablename__ = "click_rollups"
+
+    link_id = Column(Integer, primary_key=True)
+    granularity = Column(String(8), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    clicks = Column(BigInteger, nullable=False, default=0)
+
+
+class UserLinkSummary(Base):
+    __tablename__ = "user_link_summaries"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_links = Column(Integer, nullable=False, default=0)
+    expired_links = Column(Integer, nullable=False, default=0)
+    total_clicks = Column(BigInteger, nullable=False, default=0)
+    top_links = Column(JSON, nullable=False, default=list)
+    # expired_links counts links that expired up to this moment; NULL until
+    # the row is first built
+    expired_through = Column(DateTime(timezone=True))
+    # the next expiry after expired_through, when expired_links falls behind
+    refresh_at = Column(DateTime(timezone=True))
+
+
+event.listen(
+    Link.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
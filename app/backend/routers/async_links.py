@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Request, Response, status, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.backend.database.database import get_async_db
+from app.backend.schemas.schemas import LinkCreate, Link as LinkSchema, User as UserSchema
+from app.backend.services.async_link_service import AsyncLinkService
+from app.backend.services.deps import get_current_user
+from app.backend.services.link_service import redirect_headers
+
+shorten_router = APIRouter(tags=["links"])
+redirect_router = APIRouter(tags=["links"])
+
+
+@shorten_router.post("/links/shorten", response_model=LinkSchema)
+async def create_short_link(
+    link: LinkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[UserSchema] = Depends(get_current_user)
+):
+    link_service = AsyncLinkService(db)
+    return await link_service.create_short_link(
+        original_url=str(link.original_url),
+        current_user=current_user,
+        custom_alias=link.custom_alias,
+        expires_at=link.expires_at,
+        redirect_status=link.redirect_status
+    )
+
+
+@redirect_router.get("/{short_code}", response_class=Response)
+async def redirect_to_url(short_code: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    try:
+        link_service = AsyncLinkService(db)
+        link = await link_service.resolve_link(short_code)
+        link_service.check_link_expiration(link)
+        link_service.update_link_stats(
+            link.id,
+            referrer=request.headers.get("referer"),
+            user_agent=request.headers.get("user-agent")
+        )
+
+        return Response(status_code=link.redirect_status, headers=redirect_headers(link))
+    except HTTPException as e:
+        if e.status_code == status.HTTP_404_NOT_FOUND:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Short link not found"
+            )
+        raise e
@@ -1,48 +1,176 @@
-from fastapi import APIRouter, Depends, Response, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, Response, status, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Iterator, Literal, Optional, List, Union
+from datetime import datetime
+import csv
+import io
+import orjson
 
-from app.backend.database.database import get_db
-from app.backend.models.models import User
-from app.backend.schemas.schemas import LinkCreate, Link as LinkSchema, LinkStats
-from app.backend.services.deps import get_current_user
-from app.backend.services.link_service import LinkService
+from app.backend.database.database import SessionLocal, get_db
+from app.backend.schemas.schemas import (
+    BulkLinkResult, ClickBucket, LinkCreate, Link as LinkSchema, LinkStats, User as UserSchema, UserLinkSummary
+)
+from app.backend.services.analytics_service import AnalyticsService
+from app.backend.services.click_buffer import click_buffer, CLICK_STATS_MAX_STALENESS
+from app.backend.services.deps import get_current_user, get_read_db
+from app.backend.services.link_service import (
+    LinkService,
+    BULK_MAX_ITEMS,
+    EXPORT_BATCH_SIZE,
+    LINK_FIELDS,
+    PAGE_MAX_LIMIT,
+    redirect_headers,
+)
+from app.backend.services.responses import OrjsonResponse
+from app.backend.services.user_summary import UserSummaryService
 
 router = APIRouter(tags=["links"])
+shorten_router = APIRouter(tags=["links"])
+redirect_router = APIRouter(tags=["links"])
 
 
-@router.post("/links/shorten", response_model=LinkSchema)
+@shorten_router.post("/links/shorten", response_model=LinkSchema)
 def create_short_link(
     link: LinkCreate,
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[UserSchema] = Depends(get_current_user)
 ):
     link_service = LinkService(db)
     return link_service.create_short_link(
         original_url=str(link.original_url),
         current_user=current_user,
         custom_alias=link.custom_alias,
-        expires_at=link.expires_at
+        expires_at=link.expires_at,
+        redirect_status=link.redirect_status
     )
 
 
+@router.post("/links/shorten/bulk", response_model=List[BulkLinkResult])
+def create_short_links_bulk(
+    links: List[LinkCreate],
+    db: Session = Depends(get_db),
+    current_user: Optional[UserSchema] = Depends(get_current_user)
+):
+    if len(links) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {BULK_MAX_ITEMS} links per request"
+        )
+    link_service = LinkService(db)
+    return link_service.create_short_links_bulk(links, current_user=current_user)
+
+
+def _page_response(items: List[dict], next_cursor: Optional[str]) -> OrjsonResponse:
+    # rows come straight from the links columns, so they skip response_model
+    # validation; the model still documents the full shape
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return OrjsonResponse(items, headers=headers)
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(",") if name.strip()]
+
+
 @router.get("/search", response_model=List[LinkSchema])
-def search_links(original_url: str, db: Session = Depends(get_db)):
+def search_links(
+    original_url: str = Query(..., min_length=1),
+    mode: Literal["contains", "prefix", "host"] = "contains",
+    limit: int = Query(100, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
     link_service = LinkService(db)
-    return link_service.search_links(original_url)
+    field_names = _parse_fields(fields)
+    links, next_cursor = link_service.search_links(
+        original_url, mode=mode, limit=limit, cursor=cursor, fields=field_names
+    )
+    return _page_response(links, next_cursor)
 
 
 @router.get("/links/user", response_model=List[LinkSchema])
 def get_user_links(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(100, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: UserSchema = Depends(get_current_user)
 ):
     link_service = LinkService(db)
-    return link_service.get_user_links(current_user)
+    field_names = _parse_fields(fields)
+    links, next_cursor = link_service.get_user_links(
+        current_user, limit=limit, cursor=cursor, fields=field_names
+    )
+    return _page_response(links, next_cursor)
+
+
+def _export_rows(current_user: UserSchema, export_format: str) -> Iterator[Union[str, bytes]]:
+    # the request-scoped session is closed before the body is streamed,
+    # so the export keeps its own session open until the last row
+    db = SessionLocal()
+    try:
+        rows = LinkService(db).iter_user_links(current_user)
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(LINK_FIELDS)
+            for index, row in enumerate(rows, 1):
+                writer.writerow(row)
+                if index % EXPORT_BATCH_SIZE == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            # batched like the CSV branch: every chunk is a threadpool hop
+            lines = []
+            for row in rows:
+                lines.append(orjson.dumps(row._asdict(), option=orjson.OPT_UTC_Z) + b"\n")
+                if len(lines) == EXPORT_BATCH_SIZE:
+                    yield b"".join(lines)
+                    lines = []
+            yield b"".join(lines)
+    finally:
+        db.close()
+
+
+@router.get("/links/user/export")
+def export_user_links(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: UserSchema = Depends(get_current_user)
+):
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required to export user links"
+        )
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(current_user, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=links.{format}"}
+    )
+
+
+@router.get("/links/user/summary", response_model=UserLinkSummary)
+def get_user_summary(
+    db: Session = Depends(get_db),
+    current_user: UserSchema = Depends(get_current_user)
+):
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required to view link summary"
+        )
+    # primary only: a stale summary is rebuilt and written back on read
+    return UserSummaryService(db).get_summary(current_user.id)
 
 
 @router.get("/links/{short_code}", response_model=LinkSchema)
-def get_link_info(short_code: str, db: Session = Depends(get_db)):
+def get_link_info(short_code: str, db: Session = Depends(get_read_db)):
     link_service = LinkService(db)
     return link_service.get_link_by_code(short_code)
 
@@ -51,7 +179,7 @@ def get_link_info(short_code: str, db: Session = Depends(get_db)):
 def delete_link(
     short_code: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSchema = Depends(get_current_user)
 ):
     link_service = LinkService(db)
     link_service.delete_link(short_code, current_user)
@@ -63,7 +191,7 @@ def update_link(
     short_code: str,
     link: LinkCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSchema = Depends(get_current_user)
 ):
     link_service = LinkService(db)
     return link_service.update_link(
@@ -71,28 +199,59 @@ def update_link(
         current_user=current_user,
         original_url=str(link.original_url),
         expires_at=link.expires_at,
-        custom_alias=link.custom_alias
+        custom_alias=link.custom_alias,
+        redirect_status=link.redirect_status
     )
 
 
+# click stats read the primary: the buffer flushes there right before the
+# read, and a lagging replica would not show those clicks yet
 @router.get("/links/{short_code}/stats", response_model=LinkStats)
 def get_link_stats(short_code: str, db: Session = Depends(get_db)):
     link_service = LinkService(db)
-    return link_service.get_link_by_code(short_code)
+    return link_service.get_link_stats(short_code)
+
+
+@router.get("/links/{short_code}/stats/timeseries", response_model=List[ClickBucket])
+def get_link_timeseries(
+    short_code: str,
+    granularity: Literal["hour", "day"] = "hour",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    link_service = LinkService(db)
+    link = link_service.get_link_by_code(short_code)
+    link_service.check_link_expiration(link)
+    click_buffer.flush_if_stale(CLICK_STATS_MAX_STALENESS)
+    analytics_service = AnalyticsService(db)
+    return analytics_service.get_timeseries(link.id, granularity=granularity, start=start, end=end)
+
+
+@router.post("/links/{short_code}/beacon", status_code=status.HTTP_204_NO_CONTENT)
+def record_click_beacon(short_code: str, request: Request, db: Session = Depends(get_read_db)):
+    link_service = LinkService(db)
+    link_service.record_beacon(
+        short_code,
+        referrer=request.headers.get("referer"),
+        user_agent=request.headers.get("user-agent")
+    )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.get("/{short_code}", response_class=Response)
-def redirect_to_url(short_code: str, db: Session = Depends(get_db)):
+@redirect_router.get("/{short_code}", response_class=Response)
+def redirect_to_url(short_code: str, request: Request, db: Session = Depends(get_read_db)):
     try:
         link_service = LinkService(db)
-        link = link_service.get_link_by_code(short_code)
+        link = link_service.resolve_link(short_code)
         link_service.check_link_expiration(link)
-        link_service.update_link_stats(link)
-
-        return Response(
-            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
-            headers={"Location": link.original_url}
+        link_service.update_link_stats(
+            link.id,
+            referrer=request.headers.get("referer"),
+            user_agent=request.headers.get("user-agent")
         )
+
+        return Response(status_code=link.redirect_status, headers=redirect_headers(link))
     except HTTPException as e:
         if e.status_code == status.HTTP_404_NOT_FOUND:
             raise HTTPException(
@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+
+from app.backend.database.database import get_pool_stats
+from app.backend.services.cache import link_cache, missing_link_cache, shared_cache, user_cache
+from app.backend.services.click_buffer import click_buffer
+from app.backend.services.expiry_sweeper import expiry_sweeper
+
+router = APIRouter(prefix="/service", tags=["service"])
+
+
+@router.get("/cache")
+def get_cache_stats():
+    return {
+        "links": link_cache.stats(),
+        "missing_links": missing_link_cache.stats(),
+        "users": user_cache.stats(),
+        "shared_backend": type(shared_cache).__name__ if shared_cache is not None else None
+    }
+
+
+@router.get("/clicks")
+def get_click_buffer_stats():
+    return {
+        "pending": click_buffer.pending(),
+        "staleness": click_buffer.staleness(),
+        "dropped": click_buffer.dropped()
+    }
+
+
+@router.get("/pool")
+def get_db_pool_stats():
+    return get_pool_stats()
+
+
+@router.get("/sweeper")
+def get_sweeper_stats():
+    return expiry_sweeper.stats()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, HttpUrl
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
@@ -29,16 +29,21 @@ class LinkBase(BaseModel):
 
 
 class LinkCreate(LinkBase):
-    pass
+    redirect_status: Optional[Literal[301, 302, 307, 308]] = None
 
 
-class Link(LinkBase):
+# output only: stored URLs were validated on the way in, so they are not
+# parsed again as HttpUrl for every response
+class Link(BaseModel):
     id: int
+    original_url: str
     short_code: str
     user_id: Optional[int]
     created_at: datetime
+    expires_at: Optional[datetime]
     clicks: int
     last_accessed_at: Optional[datetime]
+    redirect_status: int
 
     class Config:
         from_attributes = True
@@ -51,4 +56,29 @@ class LinkStats(BaseModel):
     created_at: datetime
     clicks: int
     last_accessed_at: Optional[datetime]
-    expires_at: Optional[datetime] 
\ No newline at end of file
+    expires_at: Optional[datetime]
+
+
+class TopLink(BaseModel):
+    short_code: str
+    clicks: int
+
+
+class UserLinkSummary(BaseModel):
+    total_links: int
+    active_links: int
+    expired_links: int
+    total_clicks: int
+    top_links: List[TopLink]
+
+
+class BulkLinkResult(BaseModel):
+    index: int
+    original_url: str
+    short_code: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ClickBucket(BaseModel):
+    bucket_start: datetime
+    clicks: int
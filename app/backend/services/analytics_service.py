@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from zoneinfo import ZoneInfo
+import re
+
+from app.backend.models.models import ClickRollup
+
+GRANULARITIES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+DEFAULT_RANGES = {
+    "hour": timedelta(days=7),
+    "day": timedelta(days=30),
+}
+MAX_BUCKETS = 24 * 31
+
+BOT_PATTERN = re.compile(r"bot|crawl|spider|slurp|preview|curl|wget|python|http", re.IGNORECASE)
+TABLET_PATTERN = re.compile(r"ipad|tablet", re.IGNORECASE)
+MOBILE_PATTERN = re.compile(r"mobi|android|iphone", re.IGNORECASE)
+
+
+def classify_user_agent(user_agent: Optional[str]) -> str:
+    if not user_agent:
+        return "unknown"
+    if BOT_PATTERN.search(user_agent):
+        return "bot"
+    if TABLET_PATTERN.search(user_agent):
+        return "tablet"
+    if MOBILE_PATTERN.search(user_agent):
+        return "mobile"
+    return "desktop"
+
+
+def as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=ZoneInfo("UTC"))
+    return moment.astimezone(ZoneInfo("UTC"))
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class AnalyticsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_timeseries(
+        self,
+        link_id: int,
+        granularity: str = "hour",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[dict]:
+        step = GRANULARITIES[granularity]
+        end = as_utc(end) if end else datetime.now(ZoneInfo("UTC"))
+        start = as_utc(start) if start else end - DEFAULT_RANGES[granularity]
+
+        first_bucket = bucket_start(start, granularity)
+        last_bucket = bucket_start(end, granularity)
+        if last_bucket < first_bucket or (last_bucket - first_bucket) / step >= MAX_BUCKETS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Range must cover between 1 and {MAX_BUCKETS} buckets"
+            )
+
+        rows = self.db.query(ClickRollup.bucket_start, ClickRollup.clicks).filter(
+            ClickRollup.link_id == link_id,
+            ClickRollup.granularity == granularity,
+            ClickRollup.bucket_start >= first_bucket,
+            ClickRollup.bucket_start <= last_bucket
+        ).all()
+        clicks = {row.bucket_start: row.clicks for row in rows}
+
+        series = []
+        current = first_bucket
+        while current <= last_bucket:
+            series.append({"bucket_start": current, "clicks": clicks.get(current, 0)})
+            current += step
+        return series
@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from app.backend.models.models import Link
+from app.backend.schemas.schemas import User as UserSchema
+from app.backend.services.cache import call_shared, shared_cache
+from app.backend.services.click_buffer import click_buffer
+from app.backend.services.link_service import (
+    CachedLink,
+    DEFAULT_REDIRECT_STATUS,
+    LinkService,
+    SHORT_CODE_MAX_ATTEMPTS,
+    cache_resolved_link,
+    forget_link,
+    is_short_code_conflict,
+    lookup_cached_link,
+    remember_write,
+)
+from app.backend.services.metrics import stage_timer
+from app.backend.services.user_summary import links_created_stmt
+
+
+class AsyncLinkService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_short_link(
+        self,
+        original_url: str,
+        current_user: Optional[UserSchema] = None,
+        custom_alias: Optional[str] = None,
+        expires_at: Optional[datetime] = None,
+        redirect_status: Optional[int] = None
+    ) -> Link:
+        expires_at = LinkService.prepare_expiration(expires_at)
+
+        for _ in range(SHORT_CODE_MAX_ATTEMPTS):
+            db_link = Link(
+                original_url=original_url,
+                short_code=custom_alias or LinkService.generate_short_code(),
+                user_id=current_user.id if current_user else None,
+                expires_at=expires_at,
+                redirect_status=redirect_status or DEFAULT_REDIRECT_STATUS
+            )
+            self.db.add(db_link)
+            if current_user:
+                await self.db.execute(links_created_stmt(current_user.id, [expires_at]))
+            try:
+                await self.db.commit()
+            except IntegrityError as e:
+                await self.db.rollback()
+                if not is_short_code_conflict(e):
+                    raise
+                if custom_alias:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Custom alias already in use"
+                    )
+                continue
+
+            await call_shared(forget_link, db_link.short_code)
+            await call_shared(remember_write, db_link.user_id, db_link.short_code)
+            return db_link
+
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not allocate a short code, try again"
+        )
+
+    async def resolve_link(self, short_code: str) -> CachedLink:
+        with stage_timer("resolve_link"):
+            cached = lookup_cached_link(short_code, local_only=True)
+            if cached is None and shared_cache is not None:
+                cached = await call_shared(lookup_cached_link, short_code)
+            if cached is None:
+                result = await self.db.execute(
+                    select(Link.id, Link.original_url, Link.expires_at, Link.redirect_status)
+                    .where(Link.short_code == short_code)
+                )
+                cached = await call_shared(cache_resolved_link, short_code, result.first())
+        return cached
+
+    @stage_timer("update_link_stats")
+    def update_link_stats(
+        self,
+        link_id: int,
+        referrer: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> None:
+        click_buffer.add(link_id, referrer=referrer, user_agent=user_agent)
+
+    def check_link_expiration(self, link: CachedLink) -> None:
+        LinkService.check_link_expiration(link)
@@ -0,0 +1,246 @@
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Hashable, Iterable, NamedTuple, Optional, Union
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+import json
+import os
+import time
+
+from app.backend.services.shared_cache import SharedCacheBackend, create_shared_cache
+
+load_dotenv()
+
+LINK_CACHE_SIZE = int(os.getenv("LINK_CACHE_SIZE", 10000))
+LINK_CACHE_TTL = float(os.getenv("LINK_CACHE_TTL", 60))
+MISSING_LINK_CACHE_SIZE = int(os.getenv("MISSING_LINK_CACHE_SIZE", 100000))
+MISSING_LINK_CACHE_TTL = float(os.getenv("MISSING_LINK_CACHE_TTL", 30))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))
+READ_YOUR_WRITES_WINDOW = float(os.getenv("READ_YOUR_WRITES_WINDOW", 10))
+SHARED_CACHE_URL = os.getenv("SHARED_CACHE_URL", "")
+SHARED_CACHE_TTL = float(os.getenv("SHARED_CACHE_TTL", 300))
+SHARED_CACHE_PREFIX = os.getenv("SHARED_CACHE_PREFIX", "shortener")
+INVALIDATION_CHANNEL = f"{SHARED_CACHE_PREFIX}:invalidate"
+
+
+class CachedLink(NamedTuple):
+    id: int
+    original_url: str
+    expires_at: Optional[datetime]
+    redirect_status: int = 307
+
+
+class LRUTTLCache:
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            value, stored_until = item
+            if stored_until < time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+
+        stored_until = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, stored_until)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class TieredCache:
+    def __init__(
+        self,
+        local: LRUTTLCache,
+        shared: SharedCacheBackend,
+        namespace: str,
+        encode: Callable[[Any], str],
+        decode: Callable[[str], Any],
+        shared_ttl: float = 300.0
+    ):
+        self.local = local
+        self.shared = shared
+        self.namespace = namespace
+        self.encode = encode
+        self.decode = decode
+        self.shared_ttl = shared_ttl
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    def shared_key(self, key: str) -> str:
+        return f"{SHARED_CACHE_PREFIX}:{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        raw = self.shared.get(self.shared_key(key))
+        if raw is None:
+            self.shared_misses += 1
+            return None
+
+        value = self.decode(raw)
+        if value is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.local.set(key, value, ttl)
+        self.shared.set(self.shared_key(key), self.encode(value), self.shared_ttl if ttl is None else ttl)
+
+    def invalidate(self, key: str) -> None:
+        invalidate_many((self,), (key,))
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self.local.stats(),
+            "shared_hits": self.shared_hits,
+            "shared_misses": self.shared_misses,
+        }
+
+
+def encode_cached_link(link: CachedLink) -> str:
+    return json.dumps([
+        link.original_url,
+        link.expires_at.isoformat() if link.expires_at else None,
+        link.redirect_status,
+        link.id
+    ])
+
+
+def decode_cached_link(raw: str) -> Optional[CachedLink]:
+    items = json.loads(raw)
+    # entries written before the link id was cached read as a miss
+    if len(items) < 4:
+        return None
+    original_url, expires_at, redirect_status, link_id = items
+    return CachedLink(
+        link_id, original_url, datetime.fromisoformat(expires_at) if expires_at else None, redirect_status
+    )
+
+
+def invalidate_many(caches: Iterable[Union[LRUTTLCache, TieredCache]], keys: Iterable[str]) -> None:
+    # one pipelined DEL and PUBLISH for all shared keys instead of a pair per key
+    keys = list(keys)
+    shared, shared_keys = None, []
+    for cache in caches:
+        for key in keys:
+            if isinstance(cache, TieredCache):
+                cache.local.invalidate(key)
+                shared = cache.shared
+                shared_keys.append(cache.shared_key(key))
+            else:
+                cache.invalidate(key)
+    if shared_keys:
+        shared.invalidate(shared_keys, INVALIDATION_CHANNEL)
+
+
+def local_layer(cache: Union[LRUTTLCache, TieredCache]) -> LRUTTLCache:
+    return cache.local if isinstance(cache, TieredCache) else cache
+
+
+async def call_shared(function: Callable, *args) -> Any:
+    # the shared backend is a blocking client, so calls that may reach it
+    # run in the threadpool instead of on the event loop
+    if shared_cache is None:
+        return function(*args)
+    return await run_in_threadpool(function, *args)
+
+
+def tiered(local: LRUTTLCache, namespace: str, encode: Callable, decode: Callable, shared_ttl: float):
+    if shared_cache is None:
+        return local
+    return TieredCache(local, shared_cache, namespace, encode, decode, shared_ttl=shared_ttl)
+
+
+def start_cache_invalidation_listener() -> None:
+    if shared_cache is None:
+        return
+
+    caches = {cache.namespace: cache for cache in (link_cache, missing_link_cache)}
+
+    def on_invalidate(message: str) -> None:
+        for shared_key in message.split("\n"):
+            namespace, _, key = shared_key[len(SHARED_CACHE_PREFIX) + 1:].partition(":")
+            cache = caches.get(namespace)
+            if cache is not None:
+                cache.local.invalidate(key)
+
+    shared_cache.subscribe(INVALIDATION_CHANNEL, on_invalidate)
+
+
+shared_cache = create_shared_cache(SHARED_CACHE_URL)
+
+link_cache = tiered(
+    LRUTTLCache(maxsize=LINK_CACHE_SIZE, ttl=LINK_CACHE_TTL),
+    "links",
+    encode_cached_link,
+    decode_cached_link,
+    SHARED_CACHE_TTL
+)
+missing_link_cache = tiered(
+    LRUTTLCache(maxsize=MISSING_LINK_CACHE_SIZE, ttl=MISSING_LINK_CACHE_TTL),
+    "missing",
+    str,
+    int,
+    MISSING_LINK_CACHE_TTL
+)
+recent_writes = tiered(
+    LRUTTLCache(maxsize=MISSING_LINK_CACHE_SIZE, ttl=READ_YOUR_WRITES_WINDOW),
+    "writes",
+    str,
+    int,
+    READ_YOUR_WRITES_WINDOW
+)
+user_cache = LRUTTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
@@ -0,0 +1,314 @@
+from collections import Counter
+from datetime import datetime
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional, Set
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from zoneinfo import ZoneInfo
+import logging
+import os
+import time
+
+from app.backend.database.database import SessionLocal
+from app.backend.models.models import ClickEvent, ClickRollup, Link
+from app.backend.services.analytics_service import GRANULARITIES, bucket_start, classify_user_agent
+from app.backend.services.cache import SHARED_CACHE_PREFIX, shared_cache
+from app.backend.services.shared_cache import SharedCacheBackend
+from app.backend.services.user_summary import UserSummaryService
+
+load_dotenv()
+
+CLICK_FLUSH_INTERVAL = float(os.getenv("CLICK_FLUSH_INTERVAL", 5))
+CLICK_FLUSH_MAX_PENDING = int(os.getenv("CLICK_FLUSH_MAX_PENDING", 1000))
+CLICK_STATS_MAX_STALENESS = float(os.getenv("CLICK_STATS_MAX_STALENESS", 5))
+CLICK_BUFFER_MAX_EVENTS = int(os.getenv("CLICK_BUFFER_MAX_EVENTS", 100000))
+CLICK_SHARED_SYNC_INTERVAL = float(os.getenv("CLICK_SHARED_SYNC_INTERVAL", 0.5))
+REFERRER_MAX_LENGTH = 2048
+
+logger = logging.getLogger(__name__)
+
+
+class ClickBuffer:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval: float = 5.0,
+        max_pending: int = 1000,
+        shared: Optional[SharedCacheBackend] = None,
+        max_buffered: int = 100000,
+        shared_sync_interval: float = 0.5
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.shared = shared
+        self.shared_sync_interval = shared_sync_interval
+        # bounds both the event log and the number of distinct links kept
+        # while the database is unreachable; what does not fit is counted
+        self.max_buffered = max_buffered
+        self.dropped_events = 0
+        self.dropped_clicks = 0
+        self._pending: Dict[int, list] = {}
+        self._events: List[dict] = []
+        self._rollups: Counter = Counter()
+        self._pending_clicks = 0
+        # clicks not yet added to the shared counters, and clicks added there
+        # that the next flush has to take back out
+        self._shared_delta: Counter = Counter()
+        self._shared_pushed: Counter = Counter()
+        self._oldest: Optional[float] = None
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._wakeup = Event()
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    def add(
+        self,
+        link_id: int,
+        clicks: int = 1,
+        referrer: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> None:
+        now = datetime.now(ZoneInfo("UTC"))
+        event = {
+            "link_id": link_id,
+            "clicked_at": now,
+            "referrer": referrer[:REFERRER_MAX_LENGTH] if referrer else None,
+            "user_agent_class": classify_user_agent(user_agent)
+        }
+        with self._lock:
+            entry = self._pending.get(link_id)
+            if entry is None:
+                if len(self._pending) >= self.max_buffered:
+                    self.dropped_clicks += clicks
+                    self.dropped_events += 1
+                    return
+                self._pending[link_id] = [clicks, now]
+            else:
+                entry[0] += clicks
+                entry[1] = now
+            if len(self._events) < self.max_buffered:
+                self._events.append(event)
+            else:
+                self.dropped_events += 1
+            for granularity in GRANULARITIES:
+                self._rollups[(link_id, granularity, bucket_start(now, granularity))] += clicks
+            self._pending_clicks += clicks
+            if self.shared is not None:
+                self._shared_delta[link_id] += clicks
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = self._pending_clicks >= self.max_pending
+
+        if full:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending_clicks
+
+    def dropped(self) -> dict:
+        with self._lock:
+            return {"events": self.dropped_events, "clicks": self.dropped_clicks}
+
+    def shared_pending(self, link_id: int) -> int:
+        if self.shared is None:
+            return 0
+        return max(self.shared.get_int(self._shared_key(link_id)), 0)
+
+    def staleness(self) -> float:
+        with self._lock:
+            if self._oldest is None:
+                return 0.0
+            return time.monotonic() - self._oldest
+
+    def sync_shared(self) -> None:
+        if self.shared is None:
+            return
+        with self._flush_lock:
+            with self._lock:
+                delta, self._shared_delta = self._shared_delta, Counter()
+            if not delta:
+                return
+            pushed = self.shared.incrby_many(
+                {self._shared_key(link_id): clicks for link_id, clicks in delta.items()}, self._shared_ttl
+            )
+            with self._lock:
+                (self._shared_pushed if pushed else self._shared_delta).update(delta)
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, events, rollups = self._pending, self._events, self._rollups
+                flushed = self._pending_clicks
+                shared_delta, shared_pushed = self._shared_delta, self._shared_pushed
+                self._pending, self._events, self._rollups = {}, [], Counter()
+                self._shared_delta, self._shared_pushed = Counter(), Counter()
+                self._pending_clicks = 0
+                self._oldest = None
+
+            if not batch:
+                self._release_shared(shared_pushed)
+                return 0
+
+            stmt = (
+                update(Link.__table__)
+                .where(Link.__table__.c.id == bindparam("link_id"))
+                .values(
+                    clicks=Link.__table__.c.clicks + bindparam("n"),
+                    last_accessed_at=bindparam("accessed_at")
+                )
+            )
+            # rows are locked in one global order, so workers flushing
+            # overlapping links at the same tick queue up instead of deadlocking
+            params = [
+                {"link_id": link_id, "n": clicks, "accessed_at": accessed_at}
+                for link_id, (clicks, accessed_at) in sorted(batch.items())
+            ]
+
+            db = self.session_factory()
+            try:
+                db.execute(stmt, params)
+                rows = db.execute(
+                    select(Link.id, Link.user_id, Link.short_code, Link.clicks)
+                    .where(Link.id.in_(list(batch)))
+                ).all()
+                # clicks on links deleted since are not kept in the history
+                link_ids = {row.id for row in rows}
+                event_rows = [event for event in events if event["link_id"] in link_ids]
+                if event_rows:
+                    db.execute(insert(ClickEvent.__table__), event_rows)
+                self._write_rollups(db, link_ids, rollups)
+                UserSummaryService(db).record_clicks(
+                    rows, {link_id: clicks for link_id, (clicks, _) in batch.items()}
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                self._requeue(batch, events, rollups, shared_delta, shared_pushed)
+                logger.exception("Failed to flush %d buffered clicks", flushed)
+                return 0
+            finally:
+                db.close()
+
+            self._release_shared(shared_pushed)
+            return flushed
+
+    def flush_if_stale(self, max_staleness: float) -> None:
+        if self.staleness() > max_staleness:
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name="click-buffer-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        next_flush = time.monotonic() + self.flush_interval
+        while not self._stopped.is_set():
+            timeout = next_flush - time.monotonic()
+            if self.shared is not None:
+                timeout = min(timeout, self.shared_sync_interval)
+            woken = self._wakeup.wait(max(timeout, 0))
+            self._wakeup.clear()
+            if woken or time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.flush_interval
+            else:
+                self.sync_shared()
+
+    @property
+    def _shared_ttl(self) -> float:
+        return self.flush_interval * 10
+
+    def _release_shared(self, pushed: Counter) -> None:
+        # clicks that never reached the shared counters are simply forgotten
+        if pushed:
+            self.shared.incrby_many(
+                {self._shared_key(link_id): -clicks for link_id, clicks in pushed.items()}, self._shared_ttl
+            )
+
+    @staticmethod
+    def _shared_key(link_id: int) -> str:
+        return f"{SHARED_CACHE_PREFIX}:clicks:{link_id}"
+
+    @staticmethod
+    def _write_rollups(db: Session, link_ids: Set[int], rollups: Counter) -> None:
+        values = [
+            {"link_id": link_id, "granularity": granularity, "bucket_start": bucket, "clicks": clicks}
+            for (link_id, granularity, bucket), clicks in sorted(rollups.items()) if link_id in link_ids
+        ]
+        if not values:
+            return
+        table = ClickRollup.__table__
+        stmt = pg_insert(table).values(values)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.link_id, table.c.granularity, table.c.bucket_start],
+            set_={"clicks": table.c.clicks + stmt.excluded.clicks}
+        ))
+
+    def _requeue(
+        self,
+        batch: Dict[int, list],
+        events: List[dict],
+        rollups: Counter,
+        shared_delta: Counter,
+        shared_pushed: Counter
+    ) -> None:
+        with self._lock:
+            dropped = set()
+            for link_id, (clicks, accessed_at) in batch.items():
+                entry = self._pending.get(link_id)
+                if entry is None:
+                    if len(self._pending) >= self.max_buffered:
+                        dropped.add(link_id)
+                        self.dropped_clicks += clicks
+                        continue
+                    self._pending[link_id] = [clicks, accessed_at]
+                else:
+                    entry[0] += clicks
+                    entry[1] = max(entry[1], accessed_at)
+                self._pending_clicks += clicks
+            if dropped:
+                kept = [event for event in events if event["link_id"] not in dropped]
+                self.dropped_events += len(events) - len(kept)
+                events = kept
+                rollups = Counter({key: clicks for key, clicks in rollups.items() if key[0] not in dropped})
+            # the oldest events go first when the log is over its bound
+            events = events + self._events
+            overflow = len(events) - self.max_buffered
+            if overflow > 0:
+                self.dropped_events += overflow
+                events = events[overflow:]
+            self._events = events
+            self._rollups.update(rollups)
+            self._shared_delta.update(
+                {link_id: clicks for link_id, clicks in shared_delta.items() if link_id not in dropped}
+            )
+            # pushed clicks stay owed to the shared counters even when dropped here
+            self._shared_pushed.update(shared_pushed)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+
+
+click_buffer = ClickBuffer(
+    SessionLocal,
+    flush_interval=CLICK_FLUSH_INTERVAL,
+    max_pending=CLICK_FLUSH_MAX_PENDING,
+    shared=shared_cache,
+    max_buffered=CLICK_BUFFER_MAX_EVENTS,
+    shared_sync_interval=CLICK_SHARED_SYNC_INTERVAL
+)
@@ -1,8 +1,9 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.backend.database.database import get_db
-from app.backend.models.models import User
+from app.backend.database.database import get_db, open_read_session, replica_router
+from app.backend.schemas.schemas import User as UserSchema
+from app.backend.services.cache import recent_writes, user_cache
 from app.backend.services.security import verify_token
 from app.backend.services.user_service import UserService
 from typing import Optional
@@ -11,7 +12,10 @@ from typing import Optional
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token", auto_error=False)
 
 
-def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Optional[User]:
+def get_current_user(
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Optional[UserSchema]:
     if not token:
         return None
 
@@ -24,11 +28,37 @@ def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: Session
         if username is None:
             return None
 
-        user_service = UserService(db)
-        user = user_service.get_user_by_username(username)
+        user = user_cache.get(username)
         if user is None:
-            return None
+            user_service = UserService(db)
+            db_user = user_service.get_user_by_username(username)
+            if db_user is None:
+                return None
+            # cache a detached snapshot, not the ORM row bound to this session
+            user = UserSchema.model_validate(db_user)
+            user_cache.set(username, user)
 
         return user
     except Exception:
         return None
+
+
+def get_read_db(
+    request: Request,
+    current_user: Optional[UserSchema] = Depends(get_current_user)
+):
+    use_primary = False
+    if replica_router.engines:
+        # read-your-writes: whoever just changed something, and the codes they
+        # touched, read from the primary until replicas have caught up
+        short_code = request.path_params.get("short_code")
+        use_primary = (
+            (current_user is not None and recent_writes.get(f"user:{current_user.id}") is not None)
+            or (short_code is not None and recent_writes.get(f"code:{short_code}") is not None)
+        )
+
+    db = open_read_session(use_primary)
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Callable, Optional
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from zoneinfo import ZoneInfo
+import logging
+import os
+import time
+
+from app.backend.database.database import SessionLocal
+from app.backend.models.models import ArchivedLink, Link
+from app.backend.services.cache import invalidate_many, link_cache
+from app.backend.services.user_summary import UserSummaryService
+
+load_dotenv()
+
+SWEEP_ENABLED = os.getenv("SWEEP_ENABLED", "true").lower() == "true"
+SWEEP_INTERVAL = float(os.getenv("SWEEP_INTERVAL", 300))
+SWEEP_BATCH_SIZE = int(os.getenv("SWEEP_BATCH_SIZE", 1000))
+SWEEP_MAX_BATCHES = int(os.getenv("SWEEP_MAX_BATCHES", 100))
+SWEEP_GRACE_DAYS = float(os.getenv("SWEEP_GRACE_DAYS", 30))
+
+ARCHIVED_COLUMNS = [column.name for column in Link.__table__.columns]
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirySweeper:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: float = 300.0,
+        batch_size: int = 1000,
+        max_batches: int = 100,
+        grace_period: timedelta = timedelta(days=30)
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.grace_period = grace_period
+        self._lock = Lock()
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+        self.runs = 0
+        self.total_swept = 0
+        self.last_run_swept = 0
+        self.last_run_seconds = 0.0
+        self.last_run_at: Optional[datetime] = None
+
+    def sweep_batch(self, cutoff: datetime) -> int:
+        expired = (
+            select(Link.id)
+            .where(Link.expires_at < cutoff)
+            .order_by(Link.expires_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                delete(Link)
+                .where(Link.id.in_(expired.scalar_subquery()))
+                .returning(*[Link.__table__.c[name] for name in ARCHIVED_COLUMNS])
+            ).all()
+            if rows:
+                db.execute(insert(ArchivedLink.__table__), [row._asdict() for row in rows])
+                UserSummaryService(db).record_removed(rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        invalidate_many((link_cache,), [row.short_code for row in rows])
+        return len(rows)
+
+    def run_once(self) -> int:
+        with self._lock:
+            started = time.perf_counter()
+            cutoff = datetime.now(ZoneInfo("UTC")) - self.grace_period
+            swept = 0
+            for _ in range(self.max_batches):
+                moved = self.sweep_batch(cutoff)
+                swept += moved
+                if moved < self.batch_size or self._stopped.is_set():
+                    break
+
+            self.runs += 1
+            self.total_swept += swept
+            self.last_run_swept = swept
+            self.last_run_seconds = time.perf_counter() - started
+            self.last_run_at = datetime.now(ZoneInfo("UTC"))
+            return swept
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "total_swept": self.total_swept,
+            "last_run_swept": self.last_run_swept,
+            "last_run_seconds": round(self.last_run_seconds, 6),
+            "last_run_at": self.last_run_at,
+            "grace_period_days": self.grace_period.total_seconds() / 86400,
+        }
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name="expiry-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Expired links sweep failed")
+
+
+expiry_sweeper = ExpirySweeper(
+    SessionLocal,
+    interval=SWEEP_INTERVAL,
+    batch_size=SWEEP_BATCH_SIZE,
+    max_batches=SWEEP_MAX_BATCHES,
+    grace_period=timedelta(days=SWEEP_GRACE_DAYS)
+)
@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, status
+from starlette.types import ASGIApp, Receive, Scope, Send
+from dotenv import load_dotenv
+from zoneinfo import ZoneInfo
+import json
+import os
+
+from app.backend.services.cache import call_shared, shared_cache
+from app.backend.services.click_buffer import click_buffer
+from app.backend.services.link_service import lookup_cached_link, redirect_headers
+
+load_dotenv()
+
+REDIRECT_FAST_PATH = os.getenv("REDIRECT_FAST_PATH", "true").lower() == "true"
+
+REDIRECT_ROUTE_PATH = "/{short_code}"
+REDIRECT_DETAILS = {
+    status.HTTP_404_NOT_FOUND: "Short link not found",
+    status.HTTP_410_GONE: "Link has expired",
+}
+
+
+class RedirectFastPathMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.reserved: Optional[frozenset] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        short_code = path[1:]
+        if not short_code or "/" in short_code:
+            await self.app(scope, receive, send)
+            return
+
+        if self.reserved is None:
+            self.reserved = self._reserved_segments(scope["app"])
+        if short_code in self.reserved:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            # only the in-process layer is read on the loop; the shared one is
+            # a blocking client and goes through the threadpool
+            cached = lookup_cached_link(short_code, local_only=True)
+            if cached is None and shared_cache is not None:
+                cached = await call_shared(lookup_cached_link, short_code)
+        except HTTPException as e:
+            scope["route_path"] = REDIRECT_ROUTE_PATH
+            await self._send_error(send, e.status_code)
+            return
+
+        if cached is None or (cached.expires_at and cached.expires_at < datetime.now(ZoneInfo("UTC"))):
+            await self.app(scope, receive, send)
+            return
+
+        referrer = user_agent = None
+        for name, value in scope["headers"]:
+            if name == b"referer":
+                referrer = value.decode("latin-1")
+            elif name == b"user-agent":
+                user_agent = value.decode("latin-1")
+        # in-memory only, the flusher thread does the I/O
+        click_buffer.add(cached.id, referrer=referrer, user_agent=user_agent)
+
+        scope["route_path"] = REDIRECT_ROUTE_PATH
+        headers = [(name.lower().encode(), value.encode("latin-1")) for name, value in redirect_headers(cached).items()]
+        headers.append((b"content-length", b"0"))
+        await send({"type": "http.response.start", "status": cached.redirect_status, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    def _reserved_segments(app) -> frozenset:
+        paths = set(app.openapi()["paths"]) | {getattr(route, "path", "") for route in app.routes}
+        segments = (path.strip("/").split("/")[0] for path in paths)
+        return frozenset(segment for segment in segments if not segment.startswith("{"))
+
+    @staticmethod
+    async def _send_error(send: Send, status_code: int) -> None:
+        body = json.dumps({"detail": REDIRECT_DETAILS[status_code]}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,12 +1,130 @@
-from datetime import datetime, timedelta
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Iterator, List, Optional, Tuple, Union
+from sqlalchemy import Row, delete, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Query, Session
 from fastapi import HTTPException, status
+from dotenv import load_dotenv
+import os
 import secrets
 import string
+from urllib.parse import urlsplit
 from zoneinfo import ZoneInfo
 
-from app.backend.models.models import Link, User
+from app.backend.database.database import replica_router
+from app.backend.models.models import Link
+from app.backend.schemas.schemas import LinkCreate, LinkStats, User as UserSchema
+from app.backend.services.cache import (
+    CachedLink,
+    invalidate_many,
+    link_cache,
+    local_layer,
+    missing_link_cache,
+    recent_writes,
+)
+from app.backend.services.click_buffer import click_buffer, CLICK_STATS_MAX_STALENESS
+from app.backend.services.metrics import stage_timer
+from app.backend.services.pagination import decode_cursor, encode_cursor
+from app.backend.services.user_summary import UserSummaryService, links_created_stmt
+
+
+load_dotenv()
+
+SHORT_CODE_MAX_ATTEMPTS = 5
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 1000))
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 100000))
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", 1000))
+# pg_trgm indexes three-character grams; a shorter substring cannot use the
+# index and turns "contains" into a scan of the whole table
+SEARCH_CONTAINS_MIN_LENGTH = 3
+REDIRECT_CACHE_MAX_AGE = int(os.getenv("REDIRECT_CACHE_MAX_AGE", 86400))
+REDIRECT_BEACON_SAMPLE_RATE = float(os.getenv("REDIRECT_BEACON_SAMPLE_RATE", 0))
+DEFAULT_REDIRECT_STATUS = status.HTTP_307_TEMPORARY_REDIRECT
+PERMANENT_REDIRECT_STATUSES = (status.HTTP_301_MOVED_PERMANENTLY, status.HTTP_308_PERMANENT_REDIRECT)
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+LINK_FIELDS = (
+    "id",
+    "original_url",
+    "short_code",
+    "user_id",
+    "created_at",
+    "expires_at",
+    "clicks",
+    "last_accessed_at",
+    "redirect_status",
+)
+
+
+def is_short_code_conflict(error: IntegrityError) -> bool:
+    return "short_code" in str(error.orig)
+
+
+MISSING_LINK_DETAILS = {
+    status.HTTP_404_NOT_FOUND: "Link not found",
+    status.HTTP_410_GONE: "Link has expired",
+}
+
+
+def lookup_cached_link(short_code: str, local_only: bool = False) -> Optional[CachedLink]:
+    links, missing = link_cache, missing_link_cache
+    if local_only:
+        links, missing = local_layer(links), local_layer(missing)
+    cached = links.get(short_code)
+    if cached is None:
+        status_code = missing.get(short_code)
+        if status_code is not None:
+            raise HTTPException(status_code=status_code, detail=MISSING_LINK_DETAILS[status_code])
+    return cached
+
+
+def cache_resolved_link(short_code: str, row: Optional[Row]) -> CachedLink:
+    # the first answer for a code matches what the negative cache repeats later
+    if row is None:
+        status_code = status.HTTP_404_NOT_FOUND
+    elif row.expires_at and row.expires_at < datetime.now(ZoneInfo("UTC")):
+        status_code = status.HTTP_410_GONE
+    else:
+        cached = CachedLink(
+            id=row.id,
+            original_url=row.original_url,
+            expires_at=row.expires_at,
+            redirect_status=row.redirect_status
+        )
+        link_cache.set(short_code, cached)
+        return cached
+
+    missing_link_cache.set(short_code, status_code)
+    raise HTTPException(status_code=status_code, detail=MISSING_LINK_DETAILS[status_code])
+
+
+def redirect_headers(link: CachedLink) -> dict:
+    headers = {"Location": link.original_url}
+    if link.redirect_status not in PERMANENT_REDIRECT_STATUSES or REDIRECT_CACHE_MAX_AGE <= 0:
+        headers["Cache-Control"] = "no-store"
+        return headers
+
+    now = datetime.now(timezone.utc)
+    max_age = REDIRECT_CACHE_MAX_AGE
+    if link.expires_at:
+        max_age = max(0, min(max_age, int((link.expires_at - now).total_seconds())))
+    headers["Cache-Control"] = f"public, max-age={max_age}"
+    headers["Expires"] = format_datetime(now + timedelta(seconds=max_age), usegmt=True)
+    return headers
+
+
+def remember_write(user_id: Optional[int], *short_codes: str) -> None:
+    if not replica_router.engines:
+        return
+    if user_id is not None:
+        recent_writes.set(f"user:{user_id}", 1)
+    for short_code in short_codes:
+        recent_writes.set(f"code:{short_code}", 1)
+
+
+def forget_link(*short_codes: str) -> None:
+    invalidate_many((link_cache, missing_link_cache), short_codes)
 
 
 class LinkService:
@@ -18,13 +136,8 @@ class LinkService:
         alphabet = string.ascii_letters + string.digits
         return ''.join(secrets.choice(alphabet) for _ in range(length))
 
-    def create_short_link(
-        self,
-        original_url: str,
-        current_user: Optional[User] = None,
-        custom_alias: Optional[str] = None,
-        expires_at: Optional[datetime] = None
-    ) -> Link:
+    @staticmethod
+    def prepare_expiration(expires_at: Optional[datetime]) -> datetime:
         if expires_at:
             expires_at = expires_at.replace(tzinfo=ZoneInfo("UTC"))
             if expires_at < datetime.now(ZoneInfo("UTC")):
@@ -32,34 +145,147 @@ class LinkService:
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Expiration date must be in the future"
                 )
-        else:
-            # if user is not authenticated, set expires_at to 1 day
-            expires_at = datetime.now(ZoneInfo("UTC")) + timedelta(days=1)
+            return expires_at
 
-        if custom_alias:
-            if self.db.query(Link).filter(Link.short_code == custom_alias).first():
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Custom alias already in use"
-                )
-            short_code = custom_alias
-        else:
-            while True:
-                short_code = self.generate_short_code()
-                if not self.db.query(Link).filter(Link.short_code == short_code).first():
-                    break
-
-        db_link = Link(
-            original_url=original_url,
-            short_code=short_code,
-            user_id=current_user.id if current_user else None,
-            expires_at=expires_at
+        # if user is not authenticated, set expires_at to 1 day
+        return datetime.now(ZoneInfo("UTC")) + timedelta(days=1)
+
+    def create_short_link(
+        self,
+        original_url: str,
+        current_user: Optional[UserSchema] = None,
+        custom_alias: Optional[str] = None,
+        expires_at: Optional[datetime] = None,
+        redirect_status: Optional[int] = None
+    ) -> Link:
+        expires_at = self.prepare_expiration(expires_at)
+
+        # no pre-check: the unique index on short_code decides, and only a
+        # collision with an existing code costs an extra round trip
+        for _ in range(SHORT_CODE_MAX_ATTEMPTS):
+            db_link = Link(
+                original_url=original_url,
+                short_code=custom_alias or self.generate_short_code(),
+                user_id=current_user.id if current_user else None,
+                expires_at=expires_at,
+                redirect_status=redirect_status or DEFAULT_REDIRECT_STATUS
+            )
+            self.db.add(db_link)
+            if current_user:
+                self.db.execute(links_created_stmt(current_user.id, [expires_at]))
+            try:
+                self.db.commit()
+            except IntegrityError as e:
+                self.db.rollback()
+                if not is_short_code_conflict(e):
+                    raise
+                if custom_alias:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Custom alias already in use"
+                    )
+                continue
+
+            forget_link(db_link.short_code)
+            remember_write(db_link.user_id, db_link.short_code)
+            return db_link
+
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not allocate a short code, try again"
         )
-        self.db.add(db_link)
-        self.db.commit()
-        self.db.refresh(db_link)
-        return db_link
 
+    def create_short_links_bulk(
+        self,
+        links: List[LinkCreate],
+        current_user: Optional[UserSchema] = None
+    ) -> List[dict]:
+        results = [
+            {"index": index, "original_url": str(link.original_url), "short_code": None, "error": None}
+            for index, link in enumerate(links)
+        ]
+        rows = {}
+        aliases = set()
+
+        for result, link in zip(results, links):
+            if link.custom_alias and link.custom_alias in aliases:
+                result["error"] = "Custom alias already in use"
+                continue
+            try:
+                expires_at = self.prepare_expiration(link.expires_at)
+            except HTTPException as e:
+                result["error"] = e.detail
+                continue
+            # only rows that will be inserted reserve their alias
+            if link.custom_alias:
+                aliases.add(link.custom_alias)
+            rows[result["index"]] = {
+                "original_url": result["original_url"],
+                "user_id": current_user.id if current_user else None,
+                "expires_at": expires_at,
+                "clicks": 0,
+                "redirect_status": link.redirect_status or DEFAULT_REDIRECT_STATUS
+            }
+
+        indexes = list(rows)
+        for start in range(0, len(indexes), BULK_CHUNK_SIZE):
+            chunk = {index: rows[index] for index in indexes[start:start + BULK_CHUNK_SIZE]}
+            self._insert_links_chunk(chunk, links, results, aliases)
+
+        return results
+
+    def _insert_links_chunk(
+        self,
+        chunk: dict,
+        links: List[LinkCreate],
+        results: List[dict],
+        aliases: set
+    ) -> None:
+        for _ in range(SHORT_CODE_MAX_ATTEMPTS):
+            # codes must be unique inside the statement, otherwise ON CONFLICT
+            # would silently drop one row while both codes look inserted
+            taken = set(aliases)
+            for index, row in chunk.items():
+                short_code = links[index].custom_alias
+                if not short_code:
+                    short_code = self.generate_short_code()
+                    while short_code in taken:
+                        short_code = self.generate_short_code()
+                taken.add(short_code)
+                row["short_code"] = short_code
+
+            stmt = (
+                pg_insert(Link)
+                .values(list(chunk.values()))
+                .on_conflict_do_nothing(index_elements=[Link.short_code])
+                .returning(Link.short_code)
+            )
+            inserted = set(self.db.execute(stmt).scalars())
+            owned = [row for row in chunk.values() if row["short_code"] in inserted and row["user_id"]]
+            if owned:
+                self.db.execute(links_created_stmt(owned[0]["user_id"], [row["expires_at"] for row in owned]))
+            self.db.commit()
+
+            if inserted:
+                # rows of one request share the owner
+                forget_link(*inserted)
+                remember_write(next(iter(chunk.values()))["user_id"], *inserted)
+            retry = {}
+            for index, row in chunk.items():
+                if row["short_code"] in inserted:
+                    results[index]["short_code"] = row["short_code"]
+                elif links[index].custom_alias:
+                    results[index]["error"] = "Custom alias already in use"
+                else:
+                    retry[index] = row
+            if not retry:
+                return
+            chunk = retry
+
+        for index in chunk:
+            results[index]["error"] = "Could not allocate a short code, try again"
+
+    @stage_timer("get_link_by_code")
     def get_link_by_code(self, short_code: str) -> Link:
         link = self.db.query(Link).filter(Link.short_code == short_code).first()
         if not link:
@@ -69,21 +295,63 @@ class LinkService:
             )
         return link
 
-    def update_link_stats(self, link: Link) -> Link:
-        link.clicks += 1
-        link.last_accessed_at = datetime.now(ZoneInfo("UTC"))
-        self.db.commit()
-        self.db.refresh(link)
-        return link
+    @stage_timer("resolve_link")
+    def resolve_link(self, short_code: str) -> CachedLink:
+        cached = lookup_cached_link(short_code)
+        if cached is None:
+            row = self.db.query(Link.id, Link.original_url, Link.expires_at, Link.redirect_status).filter(
+                Link.short_code == short_code
+            ).first()
+            cached = cache_resolved_link(short_code, row)
+        return cached
+
+    @stage_timer("update_link_stats")
+    def update_link_stats(
+        self,
+        link_id: int,
+        referrer: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> None:
+        click_buffer.add(link_id, referrer=referrer, user_agent=user_agent)
+
+    def record_beacon(
+        self,
+        short_code: str,
+        referrer: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> None:
+        if REDIRECT_BEACON_SAMPLE_RATE <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Click beacons are disabled"
+            )
+        link = self.resolve_link(short_code)
+        self.check_link_expiration(link)
+        click_buffer.add(
+            link.id,
+            clicks=round(1 / REDIRECT_BEACON_SAMPLE_RATE),
+            referrer=referrer,
+            user_agent=user_agent
+        )
+
+    def get_link_stats(self, short_code: str) -> LinkStats:
+        if click_buffer.shared is None:
+            click_buffer.flush_if_stale(CLICK_STATS_MAX_STALENESS)
+        link = self.get_link_by_code(short_code)
+        stats = LinkStats.model_validate(link, from_attributes=True)
+        stats.clicks += click_buffer.shared_pending(link.id)
+        return stats
 
-    def check_link_expiration(self, link: Link) -> None:
+    @staticmethod
+    @stage_timer("check_link_expiration")
+    def check_link_expiration(link: Union[Link, CachedLink]) -> None:
         if link.expires_at and link.expires_at < datetime.now(ZoneInfo("UTC")):
             raise HTTPException(
                 status_code=status.HTTP_410_GONE,
                 detail="Link has expired"
             )
 
-    def delete_link(self, short_code: str, current_user: User) -> None:
+    def delete_link(self, short_code: str, current_user: UserSchema) -> None:
         if current_user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -98,16 +366,26 @@ class LinkService:
                 detail="Not authorized to delete this link"
             )
 
-        self.db.delete(link)
+        # links are locked before summaries, as in the click flush and the
+        # sweeper, and the deleted row carries the clicks the summary counted
+        removed = self.db.execute(
+            delete(Link)
+            .where(Link.id == link.id)
+            .returning(Link.user_id, Link.short_code, Link.expires_at, Link.clicks)
+        ).all()
+        UserSummaryService(self.db).record_removed(removed)
         self.db.commit()
+        forget_link(short_code)
+        remember_write(current_user.id, short_code)
 
     def update_link(
         self,
         short_code: str,
-        current_user: User,
+        current_user: UserSchema,
         original_url: str,
         expires_at: Optional[datetime] = None,
-        custom_alias: Optional[str] = None
+        custom_alias: Optional[str] = None,
+        redirect_status: Optional[int] = None
     ) -> Link:
         if current_user is None:
             raise HTTPException(
@@ -123,8 +401,12 @@ class LinkService:
                 detail="Not authorized to update this link"
             )
 
+        expires_at = expires_at.replace(tzinfo=ZoneInfo("UTC")) if expires_at else None
+        previous_expires_at = link.expires_at
         link.original_url = original_url
-        link.expires_at = expires_at.replace(tzinfo=ZoneInfo("UTC")) if expires_at else None
+        link.expires_at = expires_at
+        if redirect_status:
+            link.redirect_status = redirect_status
 
         if custom_alias and custom_alias != short_code:
             if self.db.query(Link).filter(Link.short_code == custom_alias).first():
@@ -134,21 +416,99 @@ class LinkService:
                 )
             link.short_code = custom_alias
 
+        # the summary counts expiries and lists codes, the URL is not in it
+        if expires_at != previous_expires_at or link.short_code != short_code:
+            # links are locked before summaries, as in the click flush and the sweeper
+            self.db.flush()
+            UserSummaryService(self.db).record_updated(link, short_code, previous_expires_at)
         self.db.commit()
-        self.db.refresh(link)
+        forget_link(short_code, link.short_code)
+        remember_write(current_user.id, short_code, link.short_code)
         return link
 
-    def search_links(self, original_url: str) -> List[Link]:
-        return self.db.query(Link).filter(
-            Link.original_url.contains(original_url)
-        ).all()
+    def search_links(
+        self,
+        original_url: str,
+        mode: str = "contains",
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[list, Optional[str]]:
+        if mode == "prefix":
+            condition = Link.original_url.startswith(original_url, autoescape=True)
+        elif mode == "host":
+            host = (urlsplit(original_url).hostname or original_url).lower()
+            condition = or_(*[
+                Link.original_url.startswith(f"{scheme}://{host}{separator}", autoescape=True)
+                for scheme in ("http", "https")
+                for separator in ("/", ":")
+            ])
+        else:
+            if len(original_url) < SEARCH_CONTAINS_MIN_LENGTH:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Search text must be at least {SEARCH_CONTAINS_MIN_LENGTH} characters long"
+                )
+            condition = Link.original_url.contains(original_url, autoescape=True)
+
+        return self._paginate(self.db.query(Link).filter(condition), limit, cursor, fields)
 
-    def get_user_links(self, current_user: User) -> List[Link]:
+    def get_user_links(
+        self,
+        current_user: UserSchema,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[list, Optional[str]]:
         if current_user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Authentication required to access user links"
             )
-        return self.db.query(Link).filter(
-            Link.user_id == current_user.id
-        ).all()
+        query = self.db.query(Link).filter(Link.user_id == current_user.id)
+        return self._paginate(query, limit, cursor, fields)
+
+    def iter_user_links(self, current_user: UserSchema, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Row]:
+        columns = [getattr(Link, name) for name in LINK_FIELDS]
+        query = (
+            self.db.query(*columns)
+            .filter(Link.user_id == current_user.id)
+            .order_by(Link.id)
+            .execution_options(stream_results=True)
+            .yield_per(batch_size)
+        )
+        yield from query
+
+    @staticmethod
+    def _paginate(
+        query: Query,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[list, Optional[str]]:
+        if fields:
+            unknown = set(fields) - set(LINK_FIELDS)
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+                )
+        else:
+            fields = list(LINK_FIELDS)
+        # plain columns instead of ORM objects: pages are rendered straight to
+        # JSON, and the keyset columns are always selected for the next cursor
+        columns = dict.fromkeys([*fields, "created_at", "id"])
+        query = query.with_entities(*[getattr(Link, name) for name in columns])
+
+        if cursor:
+            created_at, link_id = decode_cursor(cursor)
+            query = query.filter(tuple_(Link.created_at, Link.id) < (created_at, link_id))
+
+        rows = query.order_by(Link.created_at.desc(), Link.id.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+        return [{name: getattr(row, name) for name in fields} for row in rows], next_cursor
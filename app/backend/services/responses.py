@@ -0,0 +1,9 @@
+from typing import Any
+from fastapi.responses import JSONResponse
+import orjson
+
+
+class OrjsonResponse(JSONResponse):
+    # OPT_UTC_Z keeps datetimes identical to what response models produce
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
@@ -1,27 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Optional
+from threading import BoundedSemaphore, Lock
+from typing import Callable, Optional
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from dotenv import load_dotenv
+import multiprocessing
 import os
 
+from app.backend.services.metrics import stage_timer
+
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 16))
 
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = Lock()
+_hash_slots = BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+def _hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # spawn, not fork: the server process already runs threads
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _hash_pool
+
+
+def _discard_hash_pool(pool: ProcessPoolExecutor) -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        # a concurrent caller may have replaced it already
+        if _hash_pool is pool:
+            _hash_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_hash_pool() -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(cancel_futures=True)
+            _hash_pool = None
+
+
+def _run_hashing(function: Callable, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password operations in progress, try again later",
+            headers={"Retry-After": "1"}
+        )
+    try:
+        if PASSWORD_HASH_WORKERS <= 0:
+            return function(*args)
+        for _ in range(2):
+            pool = _get_hash_pool()
+            try:
+                return pool.submit(function, *args).result()
+            except BrokenProcessPool:
+                # a worker died (OOM kill, crash); start a fresh pool and retry once
+                _discard_hash_pool(pool)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Password hashing is unavailable, try again later",
+            headers={"Retry-After": "1"}
+        )
+    finally:
+        _hash_slots.release()
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _run_hashing(_verify_password, plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    return _run_hashing(_hash_password, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -34,6 +112,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+@stage_timer("verify_token")
 def verify_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
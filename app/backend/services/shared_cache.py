@@ -0,0 +1,181 @@
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+LISTENER_RETRY_DELAY = 1.0
+
+
+class SharedCacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def incrby_many(self, amounts: Mapping[str, int], ttl: float) -> bool:
+        """Add to several counters at once; False if nothing was applied."""
+
+    def get_int(self, key: str) -> int:
+        value = self.get(key)
+        return int(value) if value else 0
+
+    @abstractmethod
+    def publish(self, channel: str, message: str) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate(self, keys: Sequence[str], channel: str) -> None:
+        """Delete keys and announce them with one newline-separated message."""
+
+    @abstractmethod
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class InMemorySharedCache(SharedCacheBackend):
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, stored_until = item
+            if stored_until is not None and stored_until < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def incrby_many(self, amounts: Mapping[str, int], ttl: float) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            for key, amount in amounts.items():
+                value, stored_until = self._data.get(key, ("0", None))
+                if stored_until is not None and stored_until < now:
+                    value = "0"
+                self._data[key] = (str(int(value) + amount), now + ttl)
+        return True
+
+    def publish(self, channel: str, message: str) -> None:
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, []))
+        for callback in callbacks:
+            callback(message)
+
+    def invalidate(self, keys: Sequence[str], channel: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+        self.publish(channel, "\n".join(keys))
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+
+class RedisSharedCache(SharedCacheBackend):
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SHARED_CACHE_URL points to Redis, but the redis package is not installed")
+
+        self._client = redis.Redis.from_url(url, decode_responses=True, socket_timeout=0.5)
+        self._pubsub = None
+        self._listener = None
+        self._handlers: Dict[str, Callable] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self._client.get(key)
+        except Exception:
+            logger.warning("Shared cache GET failed for %s", key, exc_info=True)
+            return None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        try:
+            self._client.set(key, value, px=int(ttl * 1000))
+        except Exception:
+            logger.warning("Shared cache SET failed for %s", key, exc_info=True)
+
+    def incrby_many(self, amounts: Mapping[str, int], ttl: float) -> bool:
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key, amount in amounts.items():
+                pipe.incrby(key, amount)
+                pipe.pexpire(key, int(ttl * 1000))
+            pipe.execute()
+            return True
+        except Exception:
+            logger.warning("Shared cache INCRBY failed for %d keys", len(amounts), exc_info=True)
+            return False
+
+    def publish(self, channel: str, message: str) -> None:
+        try:
+            self._client.publish(channel, message)
+        except Exception:
+            logger.warning("Shared cache PUBLISH failed on %s", channel, exc_info=True)
+
+    def invalidate(self, keys: Sequence[str], channel: str) -> None:
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.delete(*keys)
+            pipe.publish(channel, "\n".join(keys))
+            pipe.execute()
+        except Exception:
+            logger.warning("Shared cache invalidation failed for %d keys", len(keys), exc_info=True)
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        if self._pubsub is None:
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._handlers[channel] = lambda message: callback(message["data"])
+        self._pubsub.subscribe(**{channel: self._handlers[channel]})
+        if self._listener is None:
+            self._listener = self._pubsub.run_in_thread(
+                sleep_time=1.0, daemon=True, exception_handler=self._on_listener_error
+            )
+
+    def _on_listener_error(self, error: BaseException, pubsub, thread) -> None:
+        # without a handler a dropped connection ends the listener thread and
+        # this worker never hears an invalidation again; invalidations missed
+        # meanwhile are bounded by the local cache TTL
+        logger.warning("Shared cache listener lost its connection, resubscribing", exc_info=error)
+        time.sleep(LISTENER_RETRY_DELAY)
+        try:
+            pubsub.subscribe(**self._handlers)
+        except Exception:
+            logger.warning("Shared cache resubscribe failed, retrying", exc_info=True)
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+        self._client.close()
+
+
+def create_shared_cache(url: Optional[str]) -> Optional[SharedCacheBackend]:
+    if not url:
+        return None
+    if url == "memory://":
+        return InMemorySharedCache()
+    return RedisSharedCache(url)
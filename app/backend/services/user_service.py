@@ -7,6 +7,7 @@ from jose import JWTError, jwt
 from app.backend.models.models import User
 from app.backend.services.security import verify_password, get_password_hash
 from app.backend.schemas.schemas import UserCreate
+from app.backend.services.cache import user_cache
 
 
 class UserService:
@@ -39,7 +40,7 @@ class UserService:
         )
         self.db.add(db_user)
         self.db.commit()
-        self.db.refresh(db_user)
+        user_cache.invalidate(db_user.username)
         return db_user
 
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Mapping, Optional, Sequence
+from sqlalchemy import Update, case, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from zoneinfo import ZoneInfo
+import os
+
+from app.backend.models.models import Link, UserLinkSummary
+
+load_dotenv()
+
+USER_SUMMARY_TOP_N = int(os.getenv("USER_SUMMARY_TOP_N", 10))
+
+summaries = UserLinkSummary.__table__
+
+
+def links_created_stmt(user_id: int, expires_at: Sequence[Optional[datetime]]) -> Update:
+    # the one summary statement for creation, executed by the sync and the
+    # async session alike
+    values = {"total_links": summaries.c.total_links + len(expires_at)}
+    expiries = [value for value in expires_at if value is not None]
+    if expiries:
+        earliest = min(expiries)
+        values["refresh_at"] = case(
+            (summaries.c.refresh_at.is_(None) | (summaries.c.refresh_at > earliest), earliest),
+            else_=summaries.c.refresh_at
+        )
+    return update(summaries).where(summaries.c.user_id == user_id).values(**values)
+
+
+class UserSummaryService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_removed(self, rows: Iterable) -> None:
+        # rows carry user_id, short_code, expires_at and clicks of links that
+        # are already deleted in this transaction
+        by_user = self._by_user(rows)
+        for summary in self._lock_summaries(by_user):
+            user_rows = by_user[summary.user_id]
+            summary.total_links -= len(user_rows)
+            summary.total_clicks -= sum(row.clicks or 0 for row in user_rows)
+            summary.expired_links -= sum(self._expired(row.expires_at, summary) for row in user_rows)
+            codes = {row.short_code for row in user_rows}
+            if any(item["short_code"] in codes for item in summary.top_links):
+                summary.top_links = self._top_list(self._top_links(summary.user_id))
+
+    def record_updated(self, link: Link, short_code: str, expires_at: Optional[datetime]) -> None:
+        # short_code and expires_at are the values before the update
+        summary = self.db.get(UserLinkSummary, link.user_id, with_for_update=True, populate_existing=True)
+        if summary is None or summary.expired_through is None:
+            return
+        summary.expired_links += self._expired(link.expires_at, summary) - self._expired(expires_at, summary)
+        if link.expires_at is not None and link.expires_at > summary.expired_through:
+            if summary.refresh_at is None or link.expires_at < summary.refresh_at:
+                summary.refresh_at = link.expires_at
+        if link.short_code != short_code:
+            summary.top_links = [
+                {**item, "short_code": link.short_code} if item["short_code"] == short_code else item
+                for item in summary.top_links
+            ]
+
+    def record_clicks(self, rows: Iterable, clicks: Mapping[int, int]) -> None:
+        # rows carry id, user_id, short_code and the already incremented clicks
+        by_user = self._by_user(rows)
+        for summary in self._lock_summaries(by_user):
+            user_rows = by_user[summary.user_id]
+            summary.total_clicks += sum(clicks[row.id] for row in user_rows)
+            # clicks only grow, so merging the flushed links into the stored
+            # top list keeps it exact
+            top = {item["short_code"]: item["clicks"] for item in summary.top_links}
+            top.update({row.short_code: row.clicks for row in user_rows})
+            summary.top_links = self._top_list(top.items())
+
+    def get_summary(self, user_id: int) -> dict:
+        now = datetime.now(ZoneInfo("UTC"))
+        summary = self.db.get(UserLinkSummary, user_id)
+        if summary is None or summary.expired_through is None:
+            summary = self._build(user_id, now)
+        elif summary.refresh_at is not None and summary.refresh_at <= now:
+            summary = self._count_expired(user_id, now)
+
+        return {
+            "total_links": summary.total_links,
+            "active_links": summary.total_links - summary.expired_links,
+            "expired_links": summary.expired_links,
+            "total_clicks": summary.total_clicks,
+            "top_links": summary.top_links,
+        }
+
+    def _build(self, user_id: int, now: datetime) -> UserLinkSummary:
+        # the row is committed (empty and not yet built) before counting, so
+        # increments from concurrent writes either wait for the lock below or
+        # land before it and get overwritten by counts that already include them
+        self.db.execute(
+            pg_insert(summaries)
+            .values(user_id=user_id, total_links=0, expired_links=0, total_clicks=0, top_links=[])
+            .on_conflict_do_nothing(index_elements=[summaries.c.user_id])
+        )
+        self.db.commit()
+        summary = self.db.get(UserLinkSummary, user_id, with_for_update=True, populate_existing=True)
+
+        totals = self.db.query(
+            func.count(Link.id),
+            func.coalesce(func.sum(Link.clicks), 0),
+            func.count(Link.id).filter(Link.expires_at <= now),
+            func.min(Link.expires_at).filter(Link.expires_at > now)
+        ).filter(Link.user_id == summary.user_id).one()
+
+        summary.total_links, summary.total_clicks, summary.expired_links, summary.refresh_at = totals
+        summary.expired_through = now
+        summary.top_links = self._top_list(self._top_links(summary.user_id))
+        self.db.commit()
+        return summary
+
+    def _count_expired(self, user_id: int, now: datetime) -> UserLinkSummary:
+        # only links that expired since the last count are read, a range over
+        # the (user_id, expires_at) index
+        summary = self.db.get(UserLinkSummary, user_id, with_for_update=True, populate_existing=True)
+        if summary.refresh_at is not None and summary.refresh_at <= now:
+            summary.expired_links += self.db.query(func.count(Link.id)).filter(
+                Link.user_id == user_id, Link.expires_at > summary.expired_through, Link.expires_at <= now
+            ).scalar()
+            summary.expired_through = now
+            summary.refresh_at = self.db.query(func.min(Link.expires_at)).filter(
+                Link.user_id == user_id, Link.expires_at > now
+            ).scalar()
+        self.db.commit()
+        return summary
+
+    def _lock_summaries(self, user_ids: Iterable[int]) -> list:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return []
+        # rows not built yet are left to the build, which counts everything
+        stored = (
+            self.db.query(UserLinkSummary)
+            .filter(UserLinkSummary.user_id.in_(user_ids))
+            .order_by(UserLinkSummary.user_id)
+            .with_for_update()
+            .populate_existing()
+            .all()
+        )
+        return [summary for summary in stored if summary.expired_through is not None]
+
+    def _top_links(self, user_id: int) -> list:
+        return (
+            self.db.query(Link.short_code, Link.clicks)
+            .filter(Link.user_id == user_id, Link.clicks > 0)
+            .order_by(Link.clicks.desc())
+            .limit(USER_SUMMARY_TOP_N)
+            .all()
+        )
+
+    @staticmethod
+    def _by_user(rows: Iterable) -> dict:
+        by_user = defaultdict(list)
+        for row in rows:
+            if row.user_id is not None:
+                by_user[row.user_id].append(row)
+        return by_user
+
+    @staticmethod
+    def _expired(expires_at: Optional[datetime], summary: UserLinkSummary) -> int:
+        return int(expires_at is not None and expires_at <= summary.expired_through)
+
+    @staticmethod
+    def _top_list(links: Iterable) -> list:
+        ranked = sorted(links, key=lambda link: link[1], reverse=True)[:USER_SUMMARY_TOP_N]
+        return [{"short_code": short_code, "clicks": clicks} for short_code, clicks in ranked]
@@ -1,5 +1,7 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional
 from dotenv import load_dotenv
 import os
 import extra_streamlit_components as stx
@@ -16,6 +18,72 @@ load_dotenv()
 
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+USER_LINKS_PAGE_SIZE = 50
+# how long reads are reused across reruns, writes from this app clear them right away
+READ_CACHE_TTL = int(os.getenv("READ_CACHE_TTL", 30))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 20))
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+http = get_http_session()
+
+
+class UncachedResponse(Exception):
+    def __init__(self, status_code: int, body):
+        super().__init__(status_code)
+        self.status_code = status_code
+        self.body = body
+
+
+@st.cache_resource
+def read_generations() -> dict:
+    # token -> counter that is part of the cache key, bumping it drops only
+    # that token's cached reads
+    return {}
+
+
+@st.cache_data(ttl=READ_CACHE_TTL, show_spinner=False)
+def _cached_get(path: str, token: Optional[str], generation: int, params: tuple = ()) -> tuple:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    response = http.get(f"{API_BASE_URL}{path}", headers=headers, params=dict(params))
+    # only successful answers are cached: st.cache_data keeps nothing for a
+    # call that raises, so an expired token or a 404 is asked again next time
+    if response.status_code >= 500:
+        response.raise_for_status()
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    if not 200 <= response.status_code < 300:
+        raise UncachedResponse(response.status_code, body)
+    return response.status_code, body, response.headers.get("X-Next-Cursor")
+
+
+def cached_get(path: str, token: Optional[str], params: tuple = ()) -> tuple:
+    try:
+        return _cached_get(path, token, read_generations().get(token, 0), params)
+    except UncachedResponse as e:
+        return e.status_code, e.body, None
+
+
+def invalidate_reads(token: Optional[str]):
+    generations = read_generations()
+    generations[token] = generations.get(token, 0) + 1
+
+
+def error_detail(body, default: str) -> str:
+    if isinstance(body, dict) and "detail" in body:
+        return f"Ошибка: {body['detail']}"
+    return default
+
 
 @st.cache_resource(experimental_allow_widgets=True)
 def get_cookie_manager():
@@ -31,6 +99,9 @@ if 'username' not in st.session_state:
     st.session_state.username = None
 if 'access_token' not in st.session_state:
     st.session_state.access_token = None
+if 'links_cursors' not in st.session_state:
+    # cursors of the pages seen so far on "Мои ссылки", the last one is shown
+    st.session_state.links_cursors = [None]
 
 
 token_from_cookie = cookie_manager.get("access_token")
@@ -45,7 +116,7 @@ if not st.session_state.is_authenticated and token_from_cookie and username_from
 
 def login(username: str, password: str) -> bool:
     try:
-        response = requests.post(
+        response = http.post(
             f"{API_BASE_URL}/auth/token",
             data={
                 "username": username,
@@ -77,7 +148,7 @@ def login(username: str, password: str) -> bool:
 
 def register(username: str, password: str) -> bool:
     try:
-        response = requests.post(
+        response = http.post(
             f"{API_BASE_URL}/auth/register",
             json={"username": username, "password": password, "email": f"{username}@example.com"}
         )
@@ -103,6 +174,7 @@ def logout():
     st.session_state.is_authenticated = False
     st.session_state.username = None
     st.session_state.access_token = None
+    st.session_state.links_cursors = [None]
 
     cookie_manager.delete("access_token", key="delete_token")
     cookie_manager.delete("username", key="delete_username")
@@ -130,13 +202,14 @@ def create_short_link(original_url: str, custom_alias: str = None, expires_at=No
         if expires_at:
             data["expires_at"] = expires_at.isoformat()
 
-        response = requests.post(
+        response = http.post(
             f"{API_BASE_URL}/links/shorten",
             json=data,
             headers=headers
         )
 
         if response.status_code == 200:
+            invalidate_reads(st.session_state.access_token)
             return response.json()
         else:
             error_msg = "Ошибка при создании ссылки"
@@ -153,29 +226,15 @@ def create_short_link(original_url: str, custom_alias: str = None, expires_at=No
 
 def search_links(original_url: str) -> list:
     try:
-        headers = {}
-        if st.session_state.is_authenticated:
-            headers["Authorization"] = f"Bearer {st.session_state.access_token}"
-
+        token = st.session_state.access_token if st.session_state.is_authenticated else None
         original_url = ensure_url_protocol(original_url)
-        
-        response = requests.get(
-            f"{API_BASE_URL}/search",
-            params={"original_url": original_url},
-            headers=headers
-        )
 
-        if response.status_code == 200:
-            return response.json()
+        status_code, body, _ = cached_get("/search", token, (("original_url", original_url),))
+
+        if status_code == 200:
+            return body
         else:
-            error_msg = "Ошибка при поиске ссылок"
-            try:
-                error_data = response.json()
-                if "detail" in error_data:
-                    error_msg = f"Ошибка: {error_data['detail']}"
-            except Exception:
-                pass
-            raise Exception(error_msg)
+            raise Exception(error_detail(body, "Ошибка при поиске ссылок"))
     except Exception as e:
         raise e
 
@@ -310,34 +369,39 @@ def _display_link_content(link_data: dict, short_url: str, show_controls=False):
                         st.error(f"Ошибка при обновлении: {str(e)}")
 
 
-def get_user_links() -> list:
-    try:
-        if not st.session_state.is_authenticated:
-            raise Exception("Пользователь не авторизован")
+def get_user_links_page(cursor: Optional[str] = None) -> tuple:
+    if not st.session_state.is_authenticated:
+        raise Exception("Пользователь не авторизован")
+
+    params = (("limit", USER_LINKS_PAGE_SIZE),)
+    if cursor:
+        params += (("cursor", cursor),)
+    status_code, body, next_cursor = cached_get("/links/user", st.session_state.access_token, params)
+
+    if status_code == 200:
+        return body, next_cursor
+    elif status_code == 401:
+        st.error("Сессия истекла. Пожалуйста, войдите снова.")
+        logout()
+        return [], None
+    else:
+        raise Exception(error_detail(body, "Ошибка при получении списка ссылок"))
 
-        headers = {"Authorization": f"Bearer {st.session_state.access_token}"}
-        response = requests.get(
-            f"{API_BASE_URL}/links/user",
-            headers=headers
-        )
 
-        if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 401:
-            st.error("Сессия истекла. Пожалуйста, войдите снова.")
-            logout()
-            return []
-        else:
-            error_msg = "Ошибка при получении списка ссылок"
-            try:
-                error_data = response.json()
-                if "detail" in error_data:
-                    error_msg = f"Ошибка: {error_data['detail']}"
-            except Exception:
-                pass
-            raise Exception(error_msg)
-    except Exception as e:
-        raise e
+def get_user_summary() -> dict:
+    if not st.session_state.is_authenticated:
+        raise Exception("Пользователь не авторизован")
+
+    status_code, body, _ = cached_get("/links/user/summary", st.session_state.access_token)
+
+    if status_code == 200:
+        return body
+    elif status_code == 401:
+        st.error("Сессия истекла. Пожалуйста, войдите снова.")
+        logout()
+        return {}
+    else:
+        raise Exception("Ошибка при получении сводки по ссылкам")
 
 
 def delete_link(short_code: str) -> bool:
@@ -347,12 +411,13 @@ def delete_link(short_code: str) -> bool:
 
         headers = {"Authorization": f"Bearer {st.session_state.access_token}"}
 
-        response = requests.delete(
+        response = http.delete(
             f"{API_BASE_URL}/links/{short_code}",
             headers=headers
         )
 
         if response.status_code in [200, 204]:
+            invalidate_reads(st.session_state.access_token)
             return True
         elif response.status_code == 401:
             st.error("Сессия истекла. Пожалуйста, войдите снова.")
@@ -386,15 +451,15 @@ def update_link(short_code: str, original_url: str = None, custom_alias: str = N
         if expires_at:
             data["expires_at"] = expires_at
 
-        response = requests.put(
+        response = http.put(
             f"{API_BASE_URL}/links/{short_code}",
             headers=headers,
             json=data
         )
 
         if response.status_code == 200:
-            result = response.json()
-            return result
+            invalidate_reads(st.session_state.access_token)
+            return response.json()
         elif response.status_code == 401:
             st.error("Сессия истекла. Пожалуйста, войдите снова.")
             logout()
@@ -559,18 +624,38 @@ else:
         st.header("Мои ссылки")
 
         try:
-            user_links = get_user_links()
+            summary = get_user_summary()
 
-            if not user_links:
+            if not summary.get("total_links"):
                 st.info("У вас пока нет созданных ссылок. Создайте первую на вкладке 'Создать ссылку'")
             else:
-                st.success(f"Найдено ссылок: {len(user_links)}")
-
-                for idx, link in enumerate(user_links, 1):
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Всего ссылок", summary["total_links"])
+                col2.metric("Активных", summary["active_links"])
+                col3.metric("Истекших", summary["expired_links"])
+                col4.metric("Переходов", summary["total_clicks"])
+                if summary["top_links"]:
+                    st.write("**Популярные ссылки**")
+                    st.table(summary["top_links"])
+
+                # one page per rerun, the totals above come from the summary
+                cursors = st.session_state.links_cursors
+                user_links, next_cursor = get_user_links_page(cursors[-1])
+                offset = (len(cursors) - 1) * USER_LINKS_PAGE_SIZE
+
+                for idx, link in enumerate(user_links, offset + 1):
                     is_expired = _is_expired(link)
                     with st.expander(f"{'⚠️' if is_expired else ''}{idx} - {link['original_url']}"):
                         display_link_details(link, use_expander=False, show_controls=True)
 
+                col_prev, col_next = st.columns(2)
+                if len(cursors) > 1 and col_prev.button("Назад"):
+                    cursors.pop()
+                    st.rerun()
+                if next_cursor and col_next.button("Далее"):
+                    cursors.append(next_cursor)
+                    st.rerun()
+
         except Exception as e:
             st.error(f"Ошибка при загрузке ссылок: {str(e)}")
 
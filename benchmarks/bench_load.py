@@ -0,0 +1,156 @@
+"""Throughput and latency of the main endpoints under concurrent load.
+
+Runs against a live server: registers a user and seeds a few links, then for
+each scenario (redirect, shorten, search, login) keeps --concurrency clients
+busy for --duration seconds and reports req/s, p50/p95/p99 and errors.
+--save-baseline stores the results as JSON; --baseline compares a run against
+a stored file and exits non-zero when a scenario regresses by more than
+--max-regression percent.
+
+    python -m benchmarks.bench_load --base-url http://localhost:8000 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_load --base-url http://localhost:8000 --baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+import uuid
+
+import httpx
+
+SCENARIOS = ("redirect", "shorten", "search", "login")
+SEED_LINKS = 100
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def make_request(scenario: str, context: dict, counter):
+    if scenario == "redirect":
+        code = context["short_codes"][next(counter) % len(context["short_codes"])]
+        return "GET", f"/{code}", {"follow_redirects": False}
+    if scenario == "shorten":
+        url = f"https://example.com/{context['run_id']}/load/{next(counter)}"
+        return "POST", "/links/shorten", {"json": {"original_url": url}, "headers": context["auth"]}
+    if scenario == "search":
+        return "GET", "/search", {"params": {"original_url": context["run_id"], "limit": 20}}
+    return "POST", "/auth/token", {"data": context["credentials"]}
+
+
+async def worker(client: httpx.AsyncClient, scenario: str, context: dict, counter, deadline: float,
+                 latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        method, url, kwargs = make_request(scenario, context, counter)
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+
+
+async def run_scenario(scenario: str, context: dict, args) -> dict:
+    latencies, errors = [], []
+    counter = itertools.count()
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*[
+            worker(client, scenario, context, counter, deadline, latencies, errors)
+            for _ in range(args.concurrency)
+        ])
+
+    return {
+        "requests_per_s": len(latencies) / args.duration,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "errors": len(errors),
+    }
+
+
+async def prepare(args) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    username = f"bench_{run_id}"
+    credentials = {"username": username, "password": "bench-password", "grant_type": "password"}
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        await client.post(
+            "/auth/register",
+            json={"username": username, "password": credentials["password"], "email": f"{username}@example.com"}
+        )
+        token = (await client.post("/auth/token", data=credentials)).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+        short_codes = []
+        for i in range(SEED_LINKS):
+            link = await client.post(
+                "/links/shorten",
+                json={"original_url": f"https://example.com/{run_id}/seed/{i}"},
+                headers=auth
+            )
+            short_codes.append(link.json()["short_code"])
+
+    return {"run_id": run_id, "credentials": credentials, "auth": auth, "short_codes": short_codes}
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    ok = True
+    print(f"\n{'scenario':<10} {'req/s':>17} {'p95, ms':>17} {'p99, ms':>17}")
+    for scenario, result in results.items():
+        reference = baseline.get(scenario)
+        if reference is None:
+            continue
+        throughput = reference["requests_per_s"]
+        deltas = {
+            "requests_per_s": (throughput - result["requests_per_s"]) / throughput * 100,
+            "p95_ms": (result["p95_ms"] - reference["p95_ms"]) / reference["p95_ms"] * 100,
+            "p99_ms": (result["p99_ms"] - reference["p99_ms"]) / reference["p99_ms"] * 100,
+        }
+        print(
+            f"{scenario:<10} "
+            + " ".join(f"{result[key]:>8.1f} ({-delta if key == 'requests_per_s' else delta:+5.1f}%)"
+                       for key, delta in deltas.items())
+        )
+        if deltas["requests_per_s"] > max_regression or deltas["p95_ms"] > max_regression:
+            ok = False
+    return ok
+
+
+async def run(args) -> bool:
+    context = await prepare(args)
+    results = {}
+    print(f"{'scenario':<10} {'req/s':>9} {'p50, ms':>9} {'p95, ms':>9} {'p99, ms':>9} {'errors':>7}")
+    for scenario in args.scenarios:
+        result = await run_scenario(scenario, context, args)
+        results[scenario] = result
+        print(
+            f"{scenario:<10} {result['requests_per_s']:>9.1f} {result['p50_ms']:>9.2f} "
+            f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['errors']:>7}"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            return compare(results, json.load(f), args.max_regression)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--baseline")
+    parser.add_argument("--max-regression", type=float, default=10)
+    if not asyncio.run(run(parser.parse_args())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
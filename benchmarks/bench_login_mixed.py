@@ -0,0 +1,91 @@
+"""Redirect latency with and without a concurrent login burst.
+
+Runs against a live server: registers a user, creates one link, then measures
+GET /{short_code} latency alone and while --login-concurrency clients hammer
+POST /auth/token. Reports login throughput, 503 rejections and redirect
+p50/p99 for both phases.
+
+    python -m benchmarks.bench_login_mixed --base-url http://localhost:8000 --duration 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def redirect_loop(client: httpx.AsyncClient, short_code: str, deadline: float, latencies: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get(f"/{short_code}", follow_redirects=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def login_loop(client: httpx.AsyncClient, credentials: dict, deadline: float, outcomes: list):
+    while time.perf_counter() < deadline:
+        response = await client.post("/auth/token", data=credentials)
+        outcomes.append(response.status_code)
+
+
+async def run_phase(base_url: str, short_code: str, credentials: dict, args, with_logins: bool) -> dict:
+    latencies, outcomes = [], []
+    deadline = time.perf_counter() + args.duration
+    limits = httpx.Limits(max_connections=args.redirect_concurrency + args.login_concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        tasks = [
+            redirect_loop(client, short_code, deadline, latencies)
+            for _ in range(args.redirect_concurrency)
+        ]
+        if with_logins:
+            tasks += [
+                login_loop(client, credentials, deadline, outcomes)
+                for _ in range(args.login_concurrency)
+            ]
+        await asyncio.gather(*tasks)
+
+    return {
+        "redirect_p50_ms": statistics.median(latencies),
+        "redirect_p99_ms": percentile(latencies, 0.99),
+        "logins_per_s": outcomes.count(200) / args.duration,
+        "logins_rejected": outcomes.count(503),
+    }
+
+
+async def run(args):
+    username = f"bench_{uuid.uuid4().hex[:8]}"
+    credentials = {"username": username, "password": "bench-password", "grant_type": "password"}
+    async with httpx.AsyncClient(base_url=args.base_url) as client:
+        await client.post(
+            "/auth/register",
+            json={"username": username, "password": credentials["password"], "email": f"{username}@example.com"}
+        )
+        link = await client.post("/links/shorten", json={"original_url": "https://example.com/bench"})
+        short_code = link.json()["short_code"]
+
+    for name, with_logins in (("redirects only", False), ("redirects + logins", True)):
+        result = await run_phase(args.base_url, short_code, credentials, args, with_logins)
+        print(
+            f"{name:<20} redirect p50 {result['redirect_p50_ms']:7.2f} ms  "
+            f"p99 {result['redirect_p99_ms']:7.2f} ms  "
+            f"logins {result['logins_per_s']:6.1f}/s  rejected {result['logins_rejected']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--redirect-concurrency", type=int, default=16)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
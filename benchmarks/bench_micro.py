@@ -0,0 +1,70 @@
+"""Micro benchmarks for the per-request hot spots.
+
+Short code generation, response model serialization, JWT verification and the
+in-process redirect cache, measured with pytest-benchmark. Needs SECRET_KEY and
+DATABASE_URL in the environment (no queries are issued).
+
+    pytest benchmarks/bench_micro.py --benchmark-autosave
+    pytest benchmarks/bench_micro.py --benchmark-compare --benchmark-compare-fail=mean:10%
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+from pydantic import TypeAdapter
+from zoneinfo import ZoneInfo
+
+from app.backend.schemas.schemas import Link, LinkStats
+from app.backend.services.cache import link_cache
+from app.backend.services.link_service import LinkService, cache_resolved_link, lookup_cached_link
+from app.backend.services.security import create_access_token, verify_token
+
+PAGE_SIZE = 100
+
+
+def make_link_rows(count: int) -> list:
+    now = datetime.now(ZoneInfo("UTC"))
+    return [
+        SimpleNamespace(
+            id=i,
+            original_url=f"https://example.com/articles/{i}?utm_source=bench",
+            custom_alias=None,
+            short_code=f"b{i:05d}",
+            user_id=1,
+            created_at=now,
+            expires_at=now + timedelta(days=1),
+            clicks=i,
+            last_accessed_at=now,
+            redirect_status=307
+        )
+        for i in range(count)
+    ]
+
+
+def test_generate_short_code(benchmark):
+    benchmark(LinkService.generate_short_code)
+
+
+def test_serialize_link_page(benchmark):
+    rows = make_link_rows(PAGE_SIZE)
+    adapter = TypeAdapter(List[Link])
+
+    benchmark(lambda: adapter.dump_json([Link.model_validate(row) for row in rows]))
+
+
+def test_serialize_link_stats(benchmark):
+    row = make_link_rows(1)[0]
+
+    benchmark(lambda: LinkStats.model_validate(row, from_attributes=True).model_dump_json())
+
+
+def test_verify_token(benchmark):
+    token = create_access_token({"sub": "bench"})
+
+    assert benchmark(verify_token, token) is not None
+
+
+def test_link_cache_hit(benchmark):
+    link_cache.clear()
+    cache_resolved_link("bench", make_link_rows(1)[0])
+
+    assert benchmark(lookup_cached_link, "bench") is not None
@@ -0,0 +1,100 @@
+"""Overhead of the regular redirect route versus the ASGI fast path.
+
+Calls the ASGI stack in-process (no sockets, no HTTP client) for a short code
+that is already in the link cache, once through RedirectFastPathMiddleware and
+once through the FastAPI route below it. Cache hits never reach the database,
+but DATABASE_URL and SECRET_KEY still have to be set for the app to import.
+
+    python -m benchmarks.bench_redirect_fast_path --requests 20000
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.backend.main import app
+from app.backend.services.fast_redirect import RedirectFastPathMiddleware
+from app.backend.services.link_service import cache_resolved_link
+
+SHORT_CODE = "benchfp"
+
+
+def make_scope() -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/{SHORT_CODE}",
+        "raw_path": f"/{SHORT_CODE}".encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench/1.0")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+        "app": app,
+    }
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def measure(asgi_app, requests: int) -> dict:
+    statuses = []
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await asgi_app(make_scope(), receive, send)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+
+    assert set(statuses) == {307}, set(statuses)
+    latencies.sort()
+    return {
+        "requests_per_s": requests / (sum(latencies) / 1_000_000),
+        "p50_us": statistics.median(latencies),
+        "p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def find_fast_path() -> RedirectFastPathMiddleware:
+    stack = app.middleware_stack or app.build_middleware_stack()
+    while not isinstance(stack, RedirectFastPathMiddleware):
+        stack = getattr(stack, "app", None)
+        if stack is None:
+            raise SystemExit("Fast path is disabled, unset REDIRECT_FAST_PATH=false")
+    return stack
+
+
+async def run(args):
+    expires_at = datetime.now(ZoneInfo("UTC")) + timedelta(days=1)
+    cache_resolved_link(
+        SHORT_CODE,
+        SimpleNamespace(id=1, original_url="https://example.com/bench", expires_at=expires_at, redirect_status=307)
+    )
+    fast_path = find_fast_path()
+
+    print(f"{'variant':<12} {'req/s':>10} {'p50, us':>9} {'p99, us':>9}")
+    for name, asgi_app in (("route", fast_path.app), ("fast path", fast_path)):
+        await measure(asgi_app, min(args.requests, 1000))
+        result = await measure(asgi_app, args.requests)
+        print(f"{name:<12} {result['requests_per_s']:>10.0f} {result['p50_us']:>9.1f} {result['p99_us']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
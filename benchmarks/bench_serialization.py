@@ -0,0 +1,112 @@
+"""Serialization time of a link list page, before and after slim output.
+
+Renders --links links to JSON bytes the ways a list endpoint can:
+
+- "HttpUrl model": validate through the old Link schema, which re-parsed
+  original_url as HttpUrl, then Pydantic's dump_json (FastAPI's default path
+  when a response_model is set)
+- "str model": the same with the current Link schema
+- "str model, orjson default": what default_response_class=ORJSONResponse
+  does - dump to Python objects, then orjson - which also turns off the
+  dump_json path above
+- "column rows, orjson": what /search and /links/user do now, plain column
+  dicts rendered by OrjsonResponse without building models
+
+The old schema also emitted an always-null custom_alias, hence the larger body.
+
+No database is needed, but DATABASE_URL and SECRET_KEY have to be set for the
+app modules to import.
+
+    python -m benchmarks.bench_serialization --links 10000
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from pydantic import ConfigDict, HttpUrl, TypeAdapter
+from zoneinfo import ZoneInfo
+import argparse
+import statistics
+import time
+
+import orjson
+
+from app.backend.models.models import Link
+from app.backend.schemas.schemas import Link as LinkSchema
+from app.backend.services.link_service import LINK_FIELDS
+from app.backend.services.responses import OrjsonResponse
+
+
+class HttpUrlLink(LinkSchema):
+    model_config = ConfigDict(from_attributes=True)
+
+    original_url: HttpUrl
+    custom_alias: Optional[str] = None
+
+
+def make_links(count: int) -> List[Link]:
+    now = datetime.now(ZoneInfo("UTC"))
+    return [
+        Link(
+            id=index,
+            original_url=f"https://example.com/articles/{index}?utm_source=bench",
+            short_code=f"b{index:06d}",
+            user_id=1,
+            created_at=now - timedelta(seconds=index),
+            expires_at=now + timedelta(days=1),
+            clicks=index % 1000,
+            last_accessed_at=now,
+            redirect_status=307,
+        )
+        for index in range(count)
+    ]
+
+
+def variants(links: List[Link]) -> dict:
+    old = TypeAdapter(List[HttpUrlLink])
+    new = TypeAdapter(List[LinkSchema])
+    # models were fed ORM objects, pages now select plain column rows
+    Row = namedtuple("Row", LINK_FIELDS)
+    rows = [Row(*[getattr(link, name) for name in LINK_FIELDS]) for link in links]
+    return {
+        "HttpUrl model": lambda: old.dump_json(old.validate_python(links)),
+        "str model": lambda: new.dump_json(new.validate_python(links)),
+        "str model, orjson default": lambda: orjson.dumps(
+            new.dump_python(new.validate_python(links), mode="json")
+        ),
+        "column rows, orjson": lambda: OrjsonResponse(
+            [{name: getattr(row, name) for name in LINK_FIELDS} for row in rows]
+        ).body,
+    }
+
+
+def measure(render: Callable[[], bytes], repeat: int) -> dict:
+    render()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = render()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "bytes": len(body)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--links", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    links = make_links(args.links)
+    print(f"{args.links} links")
+    print(f"{'variant':<28} {'median, ms':>11} {'min, ms':>9} {'bytes':>9}")
+    baseline = None
+    for name, render in variants(links).items():
+        result = measure(render, args.repeat)
+        baseline = baseline or result["median_ms"]
+        print(
+            f"{name:<28} {result['median_ms']:>11.1f} {result['min_ms']:>9.1f} {result['bytes']:>9}"
+            f"   x{baseline / result['median_ms']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Shorten latency as the links table grows.
+
+Seeds the database from DATABASE_URL up to each target size (see
+benchmarks.seeding) and times LinkService.create_short_link at
+every step, together with the number of statements each call issues.
+
+    python -m benchmarks.bench_shorten --sizes 0 100000 1000000 10000000 --samples 500
+"""
+from sqlalchemy import event
+import argparse
+import statistics
+import time
+
+from app.backend.database.database import SessionLocal, engine
+from app.backend.services.link_service import LinkService
+from benchmarks.seeding import seed_links
+
+
+def measure(samples: int) -> dict:
+    statements = []
+
+    def count_statement(*args):
+        statements[-1] += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    latencies = []
+    db = SessionLocal()
+    try:
+        link_service = LinkService(db)
+        for i in range(samples):
+            statements.append(0)
+            start = time.perf_counter()
+            link_service.create_short_link(f"https://example.com/bench/{i}")
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "statements": statistics.mean(statements),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--samples", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'p50, ms':>10} {'p99, ms':>10} {'statements':>11}")
+    for size in args.sizes:
+        rows = seed_links(size)
+        result = measure(args.samples)
+        print(f"{rows:>12} {result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f} {result['statements']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
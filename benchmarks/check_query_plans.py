@@ -0,0 +1,102 @@
+"""Query plan regression check for the owner listing and expiry scans.
+
+Seeds the links table from DATABASE_URL up to --rows rows spread over
+--users owners and a range of expiry dates, runs ANALYZE, then EXPLAINs the
+queries issued by LinkService.get_user_links (first page and a cursor page),
+ExpirySweeper.sweep_batch and the expiry count of UserSummaryService. Exits
+non-zero if any of them reads links with a sequential scan instead of the
+expected index.
+
+    alembic upgrade head
+    python -m benchmarks.check_query_plans --rows 3000000
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.dialects import postgresql
+from zoneinfo import ZoneInfo
+import argparse
+import json
+import sys
+
+from app.backend.database.database import SessionLocal
+from app.backend.models.models import Link
+from benchmarks.seeding import first_seed_user_id, seed_links
+
+EXPECTED_PLANS = {
+    "owner listing": "ix_links_user_id_created_at",
+    "owner listing, next page": "ix_links_user_id_created_at",
+    "expiry scan": "ix_links_expires_at",
+    "summary expiry count": "ix_links_user_id_expires_at",
+}
+
+
+def build_queries(user_id: int) -> dict:
+    now = datetime.now(ZoneInfo("UTC"))
+    owner = (
+        select(Link)
+        .where(Link.user_id == user_id)
+        .order_by(Link.created_at.desc(), Link.id.desc())
+        .limit(101)
+    )
+    return {
+        "owner listing": owner,
+        "owner listing, next page": owner.where(
+            tuple_(Link.created_at, Link.id) < (now - timedelta(days=1), 2 ** 31 - 1)
+        ),
+        "expiry scan": (
+            select(Link.id)
+            .where(Link.expires_at < now - timedelta(days=30))
+            .order_by(Link.expires_at)
+            .limit(1000)
+        ),
+        "summary expiry count": (
+            select(func.count(Link.id))
+            .where(Link.user_id == user_id, Link.expires_at > now - timedelta(days=1), Link.expires_at <= now)
+        ),
+    }
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(db, query) -> dict:
+    sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    return db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()[0]["Plan"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    rows = seed_links(args.rows, args.users)
+    print(f"links: {rows} rows")
+
+    failed = False
+    db = SessionLocal()
+    try:
+        user_id = first_seed_user_id(db)
+        for name, query in build_queries(user_id).items():
+            plan = explain(db, query)
+            nodes = [node for node in plan_nodes(plan) if node.get("Relation Name") == "links"]
+            indexes = {node.get("Index Name") for node in nodes}
+            ok = EXPECTED_PLANS[name] in indexes and all(node["Node Type"] != "Seq Scan" for node in nodes)
+            failed |= not ok
+            scans = ", ".join(f"{node['Node Type']} ({node.get('Index Name', '-')})" for node in nodes)
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<26} {scans}")
+            if args.verbose or not ok:
+                print(json.dumps(plan, indent=2))
+    finally:
+        db.close()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Statement check for the write paths, which should need no refresh() round trips.
+
+Runs UserService.create_user, LinkService.create_short_link (anonymous and
+for a user) and LinkService.update_link against DATABASE_URL and records
+every statement each call sends. The result is then serialized through its
+response schema while still being counted, so if an attribute had to be
+reloaded after commit, it shows up as an extra SELECT. Exits non-zero if any
+path sends different statements than expected. Created rows are deleted
+afterwards.
+
+    alembic upgrade head
+    python -m benchmarks.check_write_round_trips
+"""
+from contextlib import contextmanager
+from sqlalchemy import delete, event
+import secrets
+import sys
+
+from app.backend.database.database import SessionLocal, engine
+from app.backend.models.models import Link, User
+from app.backend.schemas.schemas import Link as LinkSchema, User as UserSchema, UserCreate
+from app.backend.services.link_service import LinkService
+from app.backend.services.user_service import UserService
+
+EXPECTED = {
+    # username and email are checked before paying for bcrypt
+    "create user": ["SELECT", "SELECT", "INSERT"],
+    "create link": ["INSERT"],
+    # the user_link_summaries counter is bumped in the same transaction
+    "create link, signed in": ["UPDATE", "INSERT"],
+    # ownership check, then the link; a new URL leaves the summary as it is
+    "update link": ["SELECT", "UPDATE"],
+}
+
+
+@contextmanager
+def recorded_statements():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def run_paths(db, name: str) -> dict:
+    results = {}
+
+    with recorded_statements() as statements:
+        user = UserService(db).create_user(
+            UserCreate(username=name, email=f"{name}@example.com", password=secrets.token_hex(8))
+        )
+        UserSchema.model_validate(user)
+    results["create user"] = statements
+
+    link_service = LinkService(db)
+    with recorded_statements() as statements:
+        LinkSchema.model_validate(link_service.create_short_link(f"https://example.com/{name}"))
+    results["create link"] = statements
+
+    with recorded_statements() as statements:
+        link = link_service.create_short_link(f"https://example.com/{name}", current_user=user)
+        LinkSchema.model_validate(link)
+    results["create link, signed in"] = statements
+
+    with recorded_statements() as statements:
+        link = link_service.update_link(
+            link.short_code, user, f"https://example.com/{name}/updated", expires_at=link.expires_at
+        )
+        LinkSchema.model_validate(link)
+    results["update link"] = statements
+
+    return results
+
+
+def main():
+    name = f"roundtrip_{secrets.token_hex(4)}"
+    db = SessionLocal()
+    try:
+        results = run_paths(db, name)
+    finally:
+        db.rollback()
+        db.execute(delete(Link).where(Link.original_url.startswith(f"https://example.com/{name}")))
+        db.execute(delete(User).where(User.username == name))
+        db.commit()
+        db.close()
+
+    failed = False
+    for path, statements in results.items():
+        verbs = [statement.split(None, 1)[0].upper() for statement in statements]
+        ok = verbs == EXPECTED[path]
+        failed |= not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {path:<24} {len(statements)} statements: {' '.join(verbs)}")
+        if not ok:
+            print(f"     expected {' '.join(EXPECTED[path])}")
+            for statement in statements:
+                print(f"     {' '.join(statement.split())[:160]}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
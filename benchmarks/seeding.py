@@ -0,0 +1,52 @@
+"""Seeding shared by the benchmarks that need a large links table.
+
+Rows are appended with INSERT ... SELECT generate_series up to a target
+count, so repeated runs only add what is missing. Seeded links expire from a
+year ago to a year ahead; with users > 0 they are spread over that many
+seed_* owners.
+"""
+from typing import Optional
+from sqlalchemy import func, select, text
+
+from app.backend.database.database import engine
+from app.backend.models.models import Link
+
+SEED_USER_PREFIX = "seed_"
+
+
+def first_seed_user_id(conn) -> Optional[int]:
+    return conn.execute(
+        text("SELECT min(id) FROM users WHERE username LIKE :prefix"),
+        {"prefix": SEED_USER_PREFIX.replace("_", "\\_") + "%"}
+    ).scalar_one()
+
+
+def seed_links(target: int, users: int = 0) -> int:
+    with engine.begin() as conn:
+        current = conn.execute(select(func.count()).select_from(Link)).scalar_one()
+        if current < target:
+            owner = "NULL"
+            if users:
+                conn.execute(
+                    text(
+                        "INSERT INTO users (username, email, hashed_password) "
+                        "SELECT :prefix || g, :prefix || g || '@example.com', '' "
+                        "FROM generate_series(1, :users) AS g ON CONFLICT DO NOTHING"
+                    ),
+                    {"prefix": SEED_USER_PREFIX, "users": users}
+                )
+                owner = f"{first_seed_user_id(conn)} + g % {users}"
+            # '_' is outside the generated code alphabet, so seeded rows
+            # never collide with real codes
+            conn.execute(
+                text(
+                    "INSERT INTO links (original_url, short_code, user_id, created_at, expires_at, clicks) "
+                    f"SELECT 'https://example.com/seed/' || g, '_' || to_hex(g), {owner}, "
+                    "now() - g * interval '1 second', "
+                    "now() + (g % 730 - 365) * interval '1 day', 0 "
+                    "FROM generate_series(:start, :stop) AS g"
+                ),
+                {"start": current + 1, "stop": target}
+            )
+        conn.execute(text("ANALYZE links"))
+        return max(current, target)